@@ -0,0 +1,486 @@
+import os, sys, time, math, random, json, struct, subprocess, tempfile
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import main
+from main import W, H, FPS
+
+TTFF_BUDGET_MS = 2500
+OCEAN_BUDGET_MS = 2.0
+
+
+def setup(backend=main.RENDERER, premultiply=main.PREMULTIPLY):
+    gfx = main.make_renderer((W, H), backend, premultiply)
+    snd = main.SoundKit()
+    ik = main.ImagesKit()
+    return gfx, snd, ik
+
+
+class HeldKeys(dict):
+    # stands in for key.get_pressed() when events are injected
+    def __missing__(self, key):
+        return False
+
+    def feed(self, e):
+        if e.type == pygame.KEYDOWN: self[e.key] = True
+        elif e.type == pygame.KEYUP: self[e.key] = False
+
+
+def script_inputs(frames, period=60):
+    # frame -> list of (type, key): row, turn, net open/close on a loop
+    out = {}
+    for f in range(0, frames, period):
+        out.setdefault(f, []).append((pygame.KEYDOWN, pygame.K_UP))
+        out.setdefault(f+8, []).append((pygame.KEYUP, pygame.K_UP))
+        out.setdefault(f+12, []).append((pygame.KEYDOWN, pygame.K_LEFT))
+        out.setdefault(f+18, []).append((pygame.KEYUP, pygame.K_LEFT))
+        out.setdefault(f+20, []).append((pygame.KEYDOWN, pygame.K_SPACE))
+        out.setdefault(f+34, []).append((pygame.KEYUP, pygame.K_SPACE))
+    return out
+
+
+def bench_input_latency(frames=480):
+    gfx, snd, ik = setup()
+    ui = main.UiKit(gfx, ik.border)
+    # same wiring as main(): nets step on the wheel, the probe samples after it
+    timers = main.TimerWheel(pygame.time.get_ticks())
+    waka = main.Waka(W/2, H/2, splash_snds=snd.row_splashes,
+                     frames=ik.waka_frames, net_frames=ik.net_frames, timers=timers)
+    probe = main.InputLatencyProbe()
+    keys = HeldKeys()
+    inputs = script_inputs(frames)
+    clock = pygame.time.Clock()
+    start = time.time()
+    for f in range(frames):
+        clock.tick(FPS)
+        for etype, key in inputs.get(f, ()):
+            pygame.event.post(pygame.event.Event(etype, key=key))
+        for e in pygame.event.get():
+            keys.feed(e)
+            if e.type in (pygame.KEYDOWN, pygame.KEYUP):
+                probe.poll(e, waka)
+                main.handle_play_event(e, waka, snd)
+        waka.handle_input(keys)
+        waka.update()
+        timers.advance(pygame.time.get_ticks())
+        probe.mark_sim(waka)
+        ui.fill_sky(start)
+        waka.draw(gfx)
+        gfx.present()
+        probe.mark_flip()
+    print(probe.format_report())
+    return True
+
+
+def bench_startup(budget_ms=TTFF_BUDGET_MS):
+    # fresh interpreter so imports and pygame.init are in the trace
+    here = os.path.dirname(os.path.abspath(__file__))
+    trace = os.path.join(tempfile.gettempdir(), "waka_startup_trace.json")
+    env = dict(os.environ, WAKA_TRACE=trace, WAKA_TTFF_BUDGET_MS=str(budget_ms))
+    res = subprocess.run([sys.executable, "main.py"], cwd=here, env=env)
+    with open(trace) as f:
+        n = len(json.load(f)["traceEvents"])
+    print(f"{n} spans written to {trace} (open in chrome://tracing or ui.perfetto.dev)")
+    return res.returncode == 0
+
+
+def bench_telemetry(n=100_000, budget_us=5.0):
+    import asyncio
+    path = os.path.join(tempfile.gettempdir(), "waka_bench_telemetry.jsonl")
+    if os.path.exists(path): os.remove(path)
+    tel = main.Telemetry(main.JsonlSink(path), capacity=n)
+    t0 = time.perf_counter()
+    for i in range(n):
+        tel.emit("catch", score=i, at_s=0.0)
+    per_emit = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    asyncio.run(tel.flush())
+    flush_s = time.perf_counter() - t0
+
+    # backpressure: a tiny buffer that nobody drains
+    small = main.Telemetry(main.JsonlSink(path), capacity=64)
+    for i in range(1000):
+        small.emit("frames", n=i)
+    small.buf.clear(); small.close(); tel.close()
+    print(f"emit {per_emit:.2f} us/event (budget {budget_us}), flush {n} events in {flush_s*1000:.0f} ms, "
+          f"written {tel.written}, dropped {small.dropped} of 1000 at capacity 64")
+    return per_emit <= budget_us and tel.written == n and small.dropped == 1000 - 64
+
+
+class NoCullCamera(main.Camera):
+    def visible(self, x, y, reach):
+        return True
+
+
+def _world_frames(gfx, ik, n, cam_cls, frames=120, fish_per_screen=2, wakes_per_screen=8):
+    main.WORLD_W, main.WORLD_H = W * n, H * n
+    rng = random.Random(1)
+    cam = cam_cls()
+    waka = main.Waka(W/2, H/2, frames=ik.waka_frames, net_frames=ik.net_frames)
+    waka.net_state = "extending"
+    trails = [main.WakeTrail(ik.wake_small, start_scale=0.7, end_scale=1.2),
+              main.WakeTrail(ik.wake_big, start_scale=0.8, end_scale=1.25),
+              main.WakeTrail(ik.rowing_wake, start_scale=0.9, end_scale=1.3, back_offset=0, life_ms=1000)]
+    # fish and old wakes scattered over the whole ocean, so the entity count grows with the world
+    school = [main.Fish(rng.uniform(0, main.WORLD_W), rng.uniform(0, main.WORLD_H),
+                        base_frames=ik.fish_frames, life=1e9)
+              for _ in range(fish_per_screen * n * n)]
+    drift = main.WakeTrail(ik.wake_big, life_ms=1e9, max_parts=1e9)
+    drift.parts = [{"x": rng.uniform(0, main.WORLD_W), "y": rng.uniform(0, main.WORLD_H),
+                    "ang": rng.uniform(0, 360), "t": 0} for _ in range(wakes_per_screen * n * n)]
+    trails.append(drift)
+    t = 0.0
+    for f in range(frames):
+        t0 = time.perf_counter()
+        waka.ang += 0.5
+        waka.vx, waka.vy = 6.0, 2.0   # cross the world quickly
+        waka.update()
+        cam.follow(waka.x, waka.y)
+        for tr in trails[:3]:
+            tr.last_spawn = -1e9
+            tr.spawn(waka.x, waka.y, waka.ang)
+            tr.update(16)
+        for fish in school:
+            if cam.visible(fish.x, fish.y, 0):
+                waka.try_catch(fish, cam)
+        gfx.fill((0, 120, 200))
+        for fish in school:
+            fish.draw(gfx, cam)
+        for tr in trails:
+            tr.draw(gfx, cam)
+        waka.draw(gfx, cam)
+        gfx.present()
+        t += time.perf_counter() - t0
+    main.WORLD_W, main.WORLD_H = W * main.WORLD_SCREENS, H * main.WORLD_SCREENS
+    return t / frames * 1000, cam
+
+
+def bench_world(sizes=(1, 4, 16), slack=2.0):
+    # culling drops the draws, but every off-screen entity still pays one Camera.visible test
+    # (a couple of microseconds), so 2560 entities adds a few ms. The game holds one fish and
+    # at most max_parts wakes per trail, too few for a spatial index to pay for itself, hence
+    # the slack; without culling the largest world is >10x the smallest
+    gfx, snd, ik = setup()
+    _world_frames(gfx, ik, sizes[0], main.Camera)  # warm the rotation caches before timing
+    res = {}
+    for n in sizes:
+        ms, cam = min((_world_frames(gfx, ik, n, main.Camera) for _ in range(3)), key=lambda r: r[0])
+        ms_all, _ = _world_frames(gfx, ik, n, NoCullCamera)
+        res[n] = ms
+        print(f"  {n:>2}x{n:<2} screens  {10*n*n:>4} entities  culled {ms:6.2f} ms/frame "
+              f"({cam.culled} skipped)   no culling {ms_all:6.2f} ms/frame")
+    flat = res[sizes[-1]] <= res[sizes[0]] * slack + 0.5
+    print(f"largest/smallest {res[sizes[-1]] / res[sizes[0]]:.2f}x: {'flat' if flat else 'GROWS'}")
+    return flat
+
+
+def _scene_frames(gfx, ik, frames=240):
+    # the play scene at its busiest: rowing waka with nets out, full wakes, fish, star
+    waka = main.Waka(W/2, H/2, frames=ik.waka_frames, net_frames=ik.net_frames)
+    waka.net_state, waka.net_idx = "held", 2
+    trails = [main.WakeTrail(ik.wake_small, start_scale=0.7, end_scale=1.2),
+              main.WakeTrail(ik.wake_big, start_scale=0.8, end_scale=1.25),
+              main.WakeTrail(ik.rowing_wake, start_scale=0.9, end_scale=1.3, back_offset=0, life_ms=1000)]
+    fish = main.Fish(W/3, H/3, base_frames=ik.fish_frames, life=1e9)
+    effect = main.CatchEffect(2*W/3, H/3, ik.stars[0])
+    font = pygame.font.Font("fonts/DejaVuSans.ttf", 16)
+    t0 = time.perf_counter()
+    for f in range(frames):
+        waka.ang += 2.0
+        waka.x = W/2 + 200 * math.cos(f / 30); waka.y = H/2 + 150 * math.sin(f / 30)
+        for tr in trails:
+            tr.last_spawn = -1e9
+            tr.spawn(waka.x, waka.y, waka.ang)
+            tr.update(16)
+        effect.t = 120 + (f * 16) % 600
+        gfx.fill((0, 120, 200))
+        effect.draw(gfx)
+        fish.draw(gfx)
+        for tr in trails:
+            tr.draw(gfx)
+        waka.draw(gfx)
+        gfx.blit(font.render(f"Fish 0/9   Time {f}s", True, (255, 255, 255)), (10, 10), transient=True)
+        gfx.present()
+    return (time.perf_counter() - t0) / frames * 1000
+
+
+def bench_renderer():
+    for backend in ("surface", "texture"):
+        gfx, snd, ik = setup(backend)
+        ms = _scene_frames(gfx, ik)
+        print(f"  {gfx.name:<8} {ms:6.2f} ms/frame")
+    return True
+
+
+def bench_fleet(sizes=(1, 10, 50), frames=300, max_growth=4.0):
+    gfx, snd, ik = setup()
+    rot = main.RotationCache()
+    res = {}
+    for n in sizes:
+        fleet = main.RivalFleet(n, ik.waka_frames, ik.net_frames, seed=1, rot_cache=rot)
+        fish = main.Fish(W/2, H/2, base_frames=ik.fish_frames, life=1e9)
+        upd = drw = 0.0
+        catches = 0
+        for f in range(frames):
+            now = f * 16
+            t0 = time.perf_counter()
+            fleet.update(now, fish)
+            if fleet.try_catch(fish) >= 0:
+                catches += 1
+                fish.x, fish.y = random.uniform(0, W), random.uniform(0, H)
+            t1 = time.perf_counter()
+            gfx.fill((0, 120, 200))
+            fleet.draw(gfx)
+            gfx.present()
+            upd += t1 - t0; drw += time.perf_counter() - t1
+        res[n] = upd / frames * 1000
+        print(f"  {n:>3} waka  update {res[n]:6.3f} ms/frame ({res[n]/n*1000:6.1f} us/waka)"
+              f"   draw {drw/frames*1000:6.2f} ms/frame   catches {catches}")
+    growth = res[sizes[-1]] / res[sizes[0]]
+    print(f"update cost {sizes[-1]}x the waka: {growth:.2f}x the time")
+    return growth <= max_growth
+
+
+class LegacySurfaceRenderer(main.SurfaceRenderer):
+    # the pre-premultiplied path: straight alpha, set_alpha on fresh and shared surfaces
+    name = "legacy"
+
+    def draw(self, img, center, angle=0.0, scale=1.0, alpha=None):
+        fresh = angle or scale != 1.0
+        if scale != 1.0:
+            img = pygame.transform.rotozoom(img, angle, scale)
+        elif angle:
+            img = pygame.transform.rotate(img, angle)
+        if alpha is None:
+            self.screen.blit(img, img.get_rect(center=center))
+        elif fresh:
+            img.set_alpha(alpha)
+            self.screen.blit(img, img.get_rect(center=center))
+        else:
+            prev = img.get_alpha()
+            img.set_alpha(alpha)
+            self.screen.blit(img, img.get_rect(center=center))
+            img.set_alpha(prev)
+
+
+def _blit_rate(gfx, sprites, seconds=1.0):
+    # sprite blits per second, each at a fixed alpha
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for i, (img, alpha) in enumerate(sprites):
+            gfx.draw(img, (100 + (i * 97) % (W - 200), 100 + (i * 61) % (H - 200)), alpha=alpha)
+        n += len(sprites)
+    return n / (time.perf_counter() - t0)
+
+
+def bench_blend():
+    rows = []
+    for label, premul, cls in (("legacy", False, LegacySurfaceRenderer),
+                               ("straight", False, main.SurfaceRenderer),
+                               ("premultiplied", True, main.SurfaceRenderer)):
+        main.make_renderer((W, H), "surface", premul)
+        gfx = cls((W, H), premultiplied=premul)
+        main.CatchEffect._cache.clear()
+        ik = main.ImagesKit()
+        sprites = ([(f, None) for f in ik.fish_frames[::3]] + [(s, 200) for s in ik.stars[:4]]
+                   + [(ik.wake_big, 96), (ik.rowing_wake, 64), (ik.border, 120)])
+        rate = _blit_rate(gfx, sprites)
+        ms = _scene_frames(gfx, ik, frames=120)
+        rows.append((label, rate, ms))
+    base = rows[0][1]
+    for label, rate, ms in rows:
+        print(f"  {label:<14} {rate:9.0f} blits/s ({rate/base:4.2f}x)   scene {ms:6.2f} ms/frame")
+    main.make_renderer((W, H))
+    return True
+
+
+def _net_session(players, frames, latency_ms, jitter_ms, loss, ik):
+    # host plus players-1 guests over a lossy loopback, on a simulated 60 fps clock
+    sim = [0]
+    link = main.LoopbackNet(latency_ms, jitter_ms, loss, seed=players, clock=lambda: sim[0])
+    make_waka = lambda: main.Waka(W/2, H/2, frames=ik.waka_frames, net_frames=ik.net_frames)
+    host = main.NetHost(link.endpoint("host"))
+    guests = [(main.NetClient(link.endpoint(f"g{i}"), "host"), make_waka(), HeldKeys(),
+               script_inputs(frames, period=60 + 7 * i)) for i in range(players - 1)]
+    local, fish, score, rng = make_waka(), None, 0, random.Random(players)
+    dt = 1000 // FPS
+    for f in range(frames):
+        sim[0] = f * dt
+        for client, waka, keys, inputs in guests:
+            for etype, key in inputs.get(f, ()):
+                keys.feed(pygame.event.Event(etype, key=key))
+            client.send_input(sim[0], main.NetClient.key_bits(keys))
+            client.sync(dt, waka, ik.fish_frames, make_waka)
+        local.update()
+        if fish is None:
+            fish = main.Fish(rng.uniform(0, W), rng.uniform(0, H), base_frames=ik.fish_frames, life=1e9)
+        fish = host.step(sim[0], local, fish, score, make_waka)
+    return host, guests, sim[0] / 1000
+
+
+def bench_net(sizes=(2, 3, 4), seconds=20, latency_ms=60, jitter_ms=30, loss=0.05, budget_bps=4096):
+    gfx, snd, ik = setup()
+    ok = True
+    frames = seconds * FPS
+    for n in sizes:
+        host, guests, secs = _net_session(n, frames, latency_ms, jitter_ms, loss, ik)
+        full = len(main.SnapshotCodec.encode(host.tick, host.history[host.tick]))
+        down = [host.bytes_out[c.transport.addr] / secs for c, *_ in guests]
+        up = [c.seq * struct.calcsize("<cIIB") / secs for c, *_ in guests]
+        cost = sorted(host.tick_cost)
+        # every guest must hold exactly what the host sent for the newest tick it decoded
+        synced = all(c.latest in host.history and c.snaps[c.latest] == host.history[c.latest]
+                     for c, *_ in guests)
+        print(f"  {n} players  down {max(down):6.0f} B/s/client  up {max(up):5.0f} B/s/client"
+              f"  full snapshot {full} B vs {sum(host.bytes_out.values()) / (host.tick * (n-1)):5.1f} B avg"
+              f"  tick {sum(cost)/len(cost)*1e6:5.1f} us (p99 {cost[int(len(cost)*0.99)]*1e6:5.1f})"
+              f"  catches {dict(host.scores)}  in sync {synced}")
+        ok = ok and synced and max(down) <= budget_bps
+    print(f"({latency_ms}+0..{jitter_ms} ms latency, {loss:.0%} loss, {main.NET_TICK_HZ} Hz ticks, "
+          f"budget {budget_bps} B/s per client)")
+    return ok
+
+
+def bench_timers(sizes=(100, 1000, 10000), seconds=10, fps_list=(30, 60, 144), tolerance=0.1):
+    # per-frame polling of n one-shot deadlines vs wheel dispatch, then fish spawn waits by frame rate
+    dt = 1000 // FPS
+    frames = seconds * 1000 // dt + 1
+    for n in sizes:
+        rng = random.Random(n)
+        dues = [rng.uniform(0, seconds * 1000) for _ in range(n)]
+        done = [False] * n
+        t0 = time.perf_counter()
+        for f in range(frames):
+            now = f * dt
+            for i in range(n):
+                if not done[i] and now >= dues[i]:
+                    done[i] = True
+        poll = (time.perf_counter() - t0) / frames
+        wheel = main.TimerWheel(0)
+        fired = []
+        for d in dues:
+            wheel.at(d, fired.append, d)
+        t0 = time.perf_counter()
+        for f in range(frames):
+            wheel.advance(f * dt)
+        disp = (time.perf_counter() - t0) / frames
+        print(f"  {n:>6} timers  poll {poll*1e6:8.1f} us/frame  wheel {disp*1e6:7.1f} us/frame"
+              f"  ({poll/disp:5.1f}x)  {wheel.stats()}")
+
+    waits = {}
+    for fps in fps_list:
+        # one fish gap after another, frames stepping the clock by 1000/fps
+        rng = random.Random(fps)
+        wheel = main.TimerWheel(0, seed=fps)
+        old, new, f = [], [], 0
+        for _ in range(2000):
+            n = 0
+            while rng.random() >= 0.02:  # the old per-frame roll
+                n += 1
+            old.append(n * 1000 / fps)
+            start, fired = f, []
+            wheel.after(wheel.rng.expovariate(main.FISH_SPAWN_PER_S) * 1000, fired.append, True)
+            while not fired:
+                f += 1
+                wheel.advance(f * 1000 / fps)
+            new.append((f - start) * 1000 / fps)
+        waits[fps] = sum(new) / len(new)
+        print(f"  {fps:>3} fps  mean fish wait: per-frame roll {sum(old)/len(old):6.0f} ms"
+              f"   wheel deadline {waits[fps]:6.0f} ms")
+    spread = (max(waits.values()) - min(waits.values())) / (1000 / main.FISH_SPAWN_PER_S)
+    return spread <= tolerance
+
+
+def _bake(gfx, threaded, workers=None):
+    main.CatchEffect._cache.clear()
+    baker = main.AssetBaker(workers, threaded=threaded)
+    t0 = time.perf_counter()
+    ik = main.ImagesKit(baker=baker)
+    ui = main.UiKit(gfx, ik.border)
+    main.CatchEffect.prebake(baker, ik.stars)
+    ui.prebake(baker, ik.stars)
+    baker.wait("derived")
+    baker.close()
+    total = time.perf_counter() - t0
+    frames = [f for v in main.CatchEffect._cache.values() for f in v]
+    surfs = (ik.fish_frames + ik.waka_frames + ik.stars + frames
+             + list(ui._border_cache.values()) + list(ui._star_cache.values()))
+    return baker.report(), total, surfs
+
+
+def bench_bake(repeats=3, workers=4):
+    # the same startup bake back to back on the main thread and on a pool of workers
+    gfx = main.make_renderer((W, H))
+    runs = {}
+    for threaded in (False, True):
+        runs[threaded] = min((_bake(gfx, threaded, workers) for _ in range(repeats)), key=lambda r: r[1])
+    (serial, t_serial, a), (pool, t_pool, b) = runs[False], runs[True]
+    for stage in pool:
+        print(f"  {stage:<8} {pool[stage]['jobs']:>3} jobs  serial {serial[stage]['wall_ms']:7.1f} ms"
+              f"  pool {pool[stage]['wall_ms']:7.1f} ms  ({serial[stage]['wall_ms']/pool[stage]['wall_ms']:4.2f}x,"
+              f" concurrency {pool[stage]['concurrency']:4.2f})")
+    same = len(a) == len(b) and all(x.get_size() == y.get_size() and
+                                    pygame.image.tobytes(x, "RGBA") == pygame.image.tobytes(y, "RGBA")
+                                    for x, y in zip(a, b))
+    print(f"  total    serial {t_serial*1000:7.1f} ms  pool {t_pool*1000:7.1f} ms  ({t_serial/t_pool:4.2f}x)"
+          f"  {workers} workers on {os.cpu_count()} cpus, identical output {same}")
+    return same
+
+
+def bench_ocean(frames=600, budget_ms=OCEAN_BUDGET_MS):
+    # ocean draw + present against a flat fill + present, the sky swept through a whole day
+    ok = True
+    for backend in ("surface", "texture"):
+        gfx = main.make_renderer((W, H), backend)
+        t0 = time.perf_counter()
+        ocean = main.OceanLayer()
+        bake = (time.perf_counter() - t0) * 1000
+        ui = main.UiKit(gfx, main.ImagesKit().border)
+        skies = [ui.sky_color(time.time() - main.TIME_LIMIT * f / frames, main.TIME_LIMIT) for f in range(frames)]
+        flat, water, draw = [], [], []
+        for f, sky in enumerate(skies):
+            t0 = time.perf_counter()
+            gfx.fill(sky)
+            gfx.present()
+            t1 = time.perf_counter()
+            ocean.draw(gfx, sky, (f * 3, f), now_ms=f * 1000 // FPS)
+            t2 = time.perf_counter()
+            gfx.present()
+            t3 = time.perf_counter()
+            flat.append(t1 - t0); water.append(t3 - t1); draw.append(t2 - t1)
+        extra = (sum(water) - sum(flat)) / frames * 1000
+        p99 = sorted(draw)[int(frames * 0.99)] * 1000
+        print(f"  {gfx.name:<8} fill {sum(flat)/frames*1000:5.2f} ms  ocean {sum(water)/frames*1000:5.2f} ms"
+              f"  (+{extra:4.2f} ms, draw p99 {p99:4.2f} ms)  {len(ocean.frames)} frames baked in {bake:.0f} ms")
+        ok = ok and extra <= budget_ms and p99 <= 2 * budget_ms
+    main.make_renderer((W, H))
+    print(f"budget +{budget_ms} ms a frame over a flat fill, p99 draw under {2*budget_ms} ms")
+    return ok
+
+
+BENCHES = {
+    "latency": bench_input_latency,
+    "startup": bench_startup,
+    "telemetry": bench_telemetry,
+    "world": bench_world,
+    "renderer": bench_renderer,
+    "fleet": bench_fleet,
+    "blend": bench_blend,
+    "net": bench_net,
+    "timers": bench_timers,
+    "bake": bench_bake,
+    "ocean": bench_ocean,
+}
+
+
+if __name__ == "__main__":
+    pygame.init()
+    random.seed(0)
+    names = sys.argv[1:] or list(BENCHES)
+    ok = True
+    for name in names:
+        print(f"== {name}")
+        ok = BENCHES[name]() and ok
+    pygame.quit()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,217 @@
+"""Stage an optimised copy of the game for pygbag and check the bundle size.
+
+    python build_assets.py --out build/wakagame            # stage + size report
+    python -m pygbag --build build/wakagame
+    python build_assets.py --check build/wakagame/build/web # fail if apk is over budget
+
+Build-time only: needs Pillow, fontTools is optional (font subsetting) and
+ffmpeg is optional (audio re-encode). Anything that can't be optimised is
+copied through unchanged.
+"""
+import argparse, fnmatch, glob, json, os, re, shutil, string, subprocess, sys
+
+BUNDLE_BUDGET_KB = 900
+GAME_FILES = ["main.py", "requirements.txt"]
+
+# sprite sequences packed into images/atlas/<name>.png, read by ImagesKit
+ATLASES = {
+    "fish":    "images/fishy/fish__{}.png",
+    "waka":    "images/waka/waka__{}.png",
+    "wakanet": "images/waka/wakanet__{}.png",
+}
+
+# largest on-screen (w, h) for images main.py draws at an absolute size.
+# The border is scaled relative to its source size, so it stays native.
+MAX_DRAWN = {
+    # stars peak at 1.0x in CatchEffect, the 56-140 px strips are the small case
+    "images/stars/matariki_star_*.png": (300, 370),
+    "images/howto/scene_*.png": (528, 537),  # show_info_slide img_area
+}
+
+# libvorbis -q per sound group, mono
+AUDIO_QUALITY = {
+    "row_splash__*": 0, "fish_splash__*": 0, "net_flip__*": 0,
+    "get-coin": 1, "*_ika": 2,
+}
+
+
+def _match(table, path, default=None):
+    for pat, val in table.items():
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if fnmatch.fnmatch(path, pat) or fnmatch.fnmatch(stem, pat):
+            return val
+    return default
+
+
+def _quantise(im):
+    from PIL import Image
+    # fast octree is the only Pillow quantiser that keeps RGBA alpha
+    return im.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+
+
+def _save_png(im, dst, quantise=True):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    im.save(dst, optimize=True)
+    if quantise:
+        tmp = dst + ".q.png"
+        _quantise(im).save(tmp, optimize=True)
+        if os.path.getsize(tmp) < os.path.getsize(dst):
+            os.replace(tmp, dst)
+        else:
+            os.remove(tmp)
+
+
+def stage_images(src, out, report, quantise=True):
+    from PIL import Image
+    packed = set()
+    for name, pattern in ATLASES.items():
+        paths = []
+        i = 1
+        while os.path.exists(os.path.join(src, pattern.format(i))):
+            paths.append(pattern.format(i)); i += 1
+        if not paths:
+            continue
+        frames = [Image.open(os.path.join(src, p)).convert("RGBA") for p in paths]
+        # shelf pack, rows no wider than 2048
+        rects, x, y, row_h = [], 0, 0, 0
+        for im in frames:
+            if x and x + im.width > 2048:
+                x, y, row_h = 0, y + row_h, 0
+            rects.append([x, y, im.width, im.height])
+            x += im.width; row_h = max(row_h, im.height)
+        sheet = Image.new("RGBA", (max(r[0]+r[2] for r in rects), y + row_h))
+        for im, r in zip(frames, rects):
+            sheet.paste(im, (r[0], r[1]))
+        dst = os.path.join(out, "images", "atlas", name + ".png")
+        _save_png(sheet, dst, quantise)
+        with open(os.path.join(out, "images", "atlas", name + ".json"), "w") as f:
+            json.dump({"image": name + ".png", "frames": rects}, f)
+        before = sum(os.path.getsize(os.path.join(src, p)) for p in paths)
+        report.append((f"images/atlas/{name}.png ({len(paths)} frames)", before, os.path.getsize(dst)))
+        packed.update(paths)
+
+    for path in sorted(glob.glob(os.path.join(src, "images", "**", "*.png"), recursive=True)):
+        rel = os.path.relpath(path, src)
+        if rel in packed:
+            continue
+        im = Image.open(path).convert("RGBA")
+        limit = _match(MAX_DRAWN, rel)
+        if limit and (im.width > limit[0] or im.height > limit[1]):
+            s = min(limit[0] / im.width, limit[1] / im.height)
+            im = im.resize((max(1, round(im.width*s)), max(1, round(im.height*s))), Image.LANCZOS)
+        dst = os.path.join(out, rel)
+        _save_png(im, dst, quantise)
+        if os.path.getsize(dst) > os.path.getsize(path) and im.size == Image.open(path).size:
+            shutil.copyfile(path, dst)
+        report.append((rel, os.path.getsize(path), os.path.getsize(dst)))
+
+
+def stage_sounds(src, out, report):
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        print("ffmpeg not found, sounds copied as-is")
+    for path in sorted(glob.glob(os.path.join(src, "sounds", "*.ogg"))):
+        rel = os.path.relpath(path, src)
+        dst = os.path.join(out, rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copyfile(path, dst)
+        q = _match(AUDIO_QUALITY, rel)
+        if ffmpeg and q is not None:
+            tmp = dst + ".tmp.ogg"
+            res = subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", path, "-ac", "1",
+                                  "-c:a", "libvorbis", "-q:a", str(q), tmp])
+            if res.returncode == 0 and os.path.getsize(tmp) < os.path.getsize(dst):
+                os.replace(tmp, dst)
+            elif os.path.exists(tmp):
+                os.remove(tmp)
+        report.append((rel, os.path.getsize(path), os.path.getsize(dst)))
+
+
+def game_text(src):
+    # every character the game can draw: ascii plus whatever main.py spells out
+    with open(os.path.join(src, "main.py"), encoding="utf-8") as f:
+        code = f.read()
+    return string.printable + "".join(sorted(set(re.findall(r"[^\x00-\x7f]", code))))
+
+
+def stage_fonts(src, out, report):
+    try:
+        from fontTools import subset
+    except ImportError:
+        subset = None
+        print("fontTools not found, fonts copied as-is")
+    text = game_text(src)
+    for path in sorted(glob.glob(os.path.join(src, "fonts", "*.ttf"))):
+        rel = os.path.relpath(path, src)
+        dst = os.path.join(out, rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        if subset:
+            opts = subset.Options()
+            font = subset.load_font(path, opts)
+            sub = subset.Subsetter(opts)
+            sub.populate(text=text)
+            sub.subset(font)
+            subset.save_font(font, dst, opts)
+        else:
+            shutil.copyfile(path, dst)
+        report.append((rel, os.path.getsize(path), os.path.getsize(dst)))
+
+
+def stage(src, out, quantise=True):
+    if os.path.exists(out):
+        shutil.rmtree(out)
+    os.makedirs(out)
+    report = []
+    for name in GAME_FILES:
+        if os.path.exists(os.path.join(src, name)):
+            shutil.copyfile(os.path.join(src, name), os.path.join(out, name))
+            report.append((name, os.path.getsize(os.path.join(src, name)), os.path.getsize(os.path.join(out, name))))
+    stage_images(src, out, report, quantise)
+    stage_sounds(src, out, report)
+    stage_fonts(src, out, report)
+    return report
+
+
+def print_report(report, budget_kb):
+    before = sum(r[1] for r in report)
+    after = sum(r[2] for r in report)
+    for name, b, a in sorted(report, key=lambda r: -r[2]):
+        print(f"  {name:<48} {b/1024:8.1f} KB -> {a/1024:8.1f} KB")
+    print(f"  {'total':<48} {before/1024:8.1f} KB -> {after/1024:8.1f} KB (budget {budget_kb} KB)")
+    return after <= budget_kb * 1024
+
+
+def check_bundle(web_dir, budget_kb):
+    apks = glob.glob(os.path.join(web_dir, "*.apk"))
+    if not apks:
+        print("no .apk in", web_dir)
+        return False
+    ok = True
+    for apk in apks:
+        size = os.path.getsize(apk)
+        over = size > budget_kb * 1024
+        ok = ok and not over
+        print(f"{apk}: {size/1024:.1f} KB, budget {budget_kb} KB: {'OVER' if over else 'ok'}")
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="optimise game assets for the web bundle")
+    ap.add_argument("--src", default=os.path.dirname(os.path.abspath(__file__)))
+    ap.add_argument("--out", default="build/wakagame")
+    ap.add_argument("--budget-kb", type=int, default=BUNDLE_BUDGET_KB)
+    ap.add_argument("--no-quantise", action="store_true")
+    ap.add_argument("--report", default="build/asset_report.json")
+    ap.add_argument("--check", metavar="WEB_DIR", help="only check the built .apk against the budget")
+    args = ap.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_bundle(args.check, args.budget_kb) else 1)
+
+    report = stage(args.src, args.out, quantise=not args.no_quantise)
+    ok = print_report(report, args.budget_kb)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump({"budget_kb": args.budget_kb,
+                   "assets": [{"path": n, "before": b, "after": a} for n, b, a in report]}, f, indent=1)
+    sys.exit(0 if ok else 1)
@@ -1,4 +1,7 @@
-import pygame, asyncio, math, random, time, os, sys
+import time
+_BOOT_T0 = time.perf_counter()
+import pygame, asyncio, math, random, os, sys, json, contextlib, collections, atexit, heapq, struct, threading
+_IMPORTED = time.perf_counter()
 
 W, H = 1200, 680
 FPS = 60
@@ -13,14 +16,173 @@ BRAKE = 0.95
 ROW_WAKE_DELAY_MS = 120
 PRE_END_DELAY_MS = 600   # wait before showing end screen
 END_DELAY_MS = 800       # wait on end screen before buttons
+END_STARS_H = 140        # star strip height on the end screen, prebaked at startup
+TELEMETRY_PATH = os.environ.get("WAKA_TELEMETRY", "telemetry.jsonl")  # "" turns it off
+WORLD_SCREENS = max(1, int(os.environ.get("WAKA_WORLD_SCREENS", "1")))  # >1 is large-ocean mode
+WORLD_W, WORLD_H = W * WORLD_SCREENS, H * WORLD_SCREENS
+RENDERER = os.environ.get("WAKA_RENDERER", "surface")  # surface | texture
+RIVALS = int(os.environ.get("WAKA_RIVALS", "0"))  # ai waka racing for the fish
+# software path keeps assets premultiplied and blits with BLEND_PREMULTIPLIED
+PREMULTIPLY = os.environ.get("WAKA_PREMUL", "1") != "0"
+PREMULTIPLIED = False  # what the current renderer wants, set by make_renderer
+NET_HOST = os.environ.get("WAKA_HOST", "")  # udp port to host a 2-4 player game on
+NET_JOIN = os.environ.get("WAKA_JOIN", "")  # host:port to join
+NET_TICK_HZ = 20
+FISH_SPAWN_PER_S = 1.2  # the old 2% chance a frame at 60 fps, now a seeded deadline
+SEED = int(os.environ["WAKA_SEED"]) if os.environ.get("WAKA_SEED") else None
+# animated water under the play field, needs numpy so it is off by default in the web bundle
+OCEAN = os.environ.get("WAKA_OCEAN", "0" if sys.platform == "emscripten" else "1") != "0"
+OCEAN_BLUE = (0,70,120)
 BRT_WHITE = (255,255,255)
 OFF_WHITE = (245,245,245)
 MAORI_RED = (212,0,0)
 DARK_GRAY = (30,30,30)
 EGG_SHELL = (255,235,120)
+QUIT_EVENTS = (pygame.QUIT, pygame.WINDOWCLOSE)  # texture renderer has a second, hidden window
 
-pygame.init()
 
+class StartupTrace:
+    # named spans from process boot to the first menu flip, chrome trace format
+    def __init__(self, t0):
+        self.t0 = t0
+        self.spans = []  # (name, start, end, tid) in perf_counter seconds
+        self.first_frame_at = None
+
+    @property
+    def done(self):
+        return self.first_frame_at is not None
+
+    def add(self, name, start, end, tid=1):
+        if not self.done:
+            self.spans.append((name, start, end, tid))
+
+    @contextlib.contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter())
+
+    def ttff_ms(self):
+        return (self.first_frame_at - self.t0) * 1000 if self.done else None
+
+    def first_frame(self, frame_start):
+        if self.done:
+            return
+        now = time.perf_counter()
+        self.add("menu.first_frame", frame_start, now)
+        self.first_frame_at = now
+        path = os.environ.get("WAKA_TRACE")
+        if path:
+            self.write(path)
+        budget = os.environ.get("WAKA_TTFF_BUDGET_MS")
+        if budget:
+            # startup check mode, exit status says whether we made the budget
+            ok = self.check(float(budget))
+            pygame.quit()
+            sys.exit(0 if ok else 1)
+
+    def to_chrome(self):
+        us = lambda t: int((t - self.t0) * 1e6)
+        events = [{"name": n, "cat": "startup", "ph": "X", "pid": 1, "tid": tid,
+                   "ts": us(a), "dur": max(0, us(b) - us(a))} for n, a, b, tid in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+
+    def check(self, budget_ms):
+        for n, a, b, tid in sorted(self.spans, key=lambda s: (s[1], -s[2])):
+            if tid != 1:
+                continue  # baker jobs, see the trace
+            print(f"  {n:<22} {(a-self.t0)*1000:8.1f} +{(b-a)*1000:7.1f} ms")
+        ttff = self.ttff_ms()
+        ok = ttff is not None and ttff <= budget_ms
+        print(f"time to first frame {ttff:.1f} ms, budget {budget_ms:g} ms: {'ok' if ok else 'OVER'}")
+        return ok
+
+
+STARTUP = StartupTrace(_BOOT_T0)
+STARTUP.add("imports", _BOOT_T0, _IMPORTED)
+with STARTUP.span("pygame.init"):
+    pygame.init()
+
+
+
+class AssetBaker:
+    # startup decode/transform jobs on a thread pool, image.load and transform drop the gil.
+    # Jobs are submitted after their deps, so fifo workers never wait on queued work.
+    def __init__(self, workers=None, threaded=None):
+        workers = workers or min(8, os.cpu_count() or 1)
+        if threaded is None:
+            # no threads in the browser build, and one worker only adds hand-off cost
+            threaded = sys.platform != "emscripten" and workers > 1
+        from concurrent.futures import Future, ThreadPoolExecutor
+        self._future = Future
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="bake") if threaded else None
+        self.futures = {}
+        self.stages = collections.OrderedDict()  # name -> {"jobs", "busy", "t0", "wall"}
+        self.lock = threading.Lock()
+
+    def submit(self, name, fn, *args, deps=(), stage="bake", done=None):
+        # fn gets the results of deps, then args. done runs on the main thread in wait()
+        st = self.stages.setdefault(stage, {"jobs": [], "busy": 0.0, "t0": time.perf_counter(), "wall": None})
+        deps = [self.futures[d] for d in deps]
+        job = lambda: self._run(name, st, fn, [d.result() for d in deps] + list(args))
+        if self.pool:
+            fut = self.pool.submit(job)
+        else:
+            fut = self._future()
+            fut.set_result(job())
+        self.futures[name] = fut
+        st["jobs"].append((fut, done))
+        return name
+
+    def _run(self, name, st, fn, args):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        t1 = time.perf_counter()
+        with self.lock:
+            st["busy"] += t1 - t0
+        STARTUP.add(f"bake {name}", t0, t1, tid=threading.get_ident() % 1000 + 2)
+        return out
+
+    def result(self, name):
+        return self.futures[name].result()
+
+    def wait(self, stage):
+        st = self.stages.get(stage)
+        if not st:
+            return
+        for fut, done in st["jobs"]:
+            r = fut.result()
+            if done:
+                done(r)
+        st["wall"] = time.perf_counter() - st["t0"]
+        STARTUP.add(f"bake.{stage}", st["t0"], st["t0"] + st["wall"])
+
+    def report(self):
+        # per stage: jobs, summed job time, wall time, and how many jobs ran at once on average.
+        # concurrency is not a speedup, jobs slow each other down; bench.py bake times a serial run
+        return {k: {"jobs": len(st["jobs"]), "busy_ms": st["busy"] * 1000, "wall_ms": (st["wall"] or 0) * 1000,
+                    "concurrency": st["busy"] / st["wall"] if st["wall"] else 0.0}
+                for k, st in self.stages.items()}
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False)
+
+
+def fade(surf, alpha, premultiplied=None):
+    # faded copy for precomputed fades, the source surface is left alone
+    if premultiplied is None:
+        premultiplied = PREMULTIPLIED
+    a = max(0, min(255, int(alpha)))
+    out = surf.copy()
+    out.fill((a, a, a, a) if premultiplied else (255, 255, 255, a), special_flags=pygame.BLEND_RGBA_MULT)
+    return out
 
 
 class ImagesKit:
@@ -29,23 +191,48 @@ class ImagesKit:
                  fish_frame_count=27, waka_frame_count=7, star_count=9, net_frame_count=3,
                  wake_big="waka/waka_wake_big.png",
                  wake_small="waka/waka_wake_small.png",
-                 rowing_wake="waka/rowing_wake.png"):
+                 rowing_wake="waka/rowing_wake.png", premultiply=None, baker=None):
         self.base = base
+        self.premultiply = PREMULTIPLIED if premultiply is None else premultiply
         self._scale_cache = {}  # (id(surface), round(scale,3)) -> scaled surface
 
         def _load(rel, alpha=True):
             surf = pygame.image.load(os.path.join(self.base, rel))
-            return surf.convert_alpha() if alpha else surf.convert()
-
-        # load once
-        self.border       = _load(border_path, True)
-        self.fish_frames  = [_load(f"fishy/fish__{i}.png", True) for i in range(1, fish_frame_count+1)]
-        self.waka_frames  = [_load(f"waka/waka__{i}.png", True)  for i in range(1, waka_frame_count+1)]
-        self.net_frames   = [_load(f"waka/wakanet__{i}.png", True) for i in range(1, net_frame_count+1)]
-        self.stars        = [_load(f"stars/matariki_star_{i}.png", True) for i in range(1, star_count+1)]
-        self.wake_big     = _load(wake_big, True)
-        self.wake_small   = _load(wake_small, True)
-        self.rowing_wake  = _load(rowing_wake, True)
+            if not alpha:
+                return surf.convert()
+            # display format once, premultiplied once
+            surf = surf.convert_alpha()
+            return surf.premul_alpha() if self.premultiply else surf
+
+        bk = baker or AssetBaker(threaded=False)
+        job = lambda rel: bk.submit(rel, _load, rel, stage="images")
+
+        def _load_seq(folder, stem, count):
+            # build_assets.py packs sequences into atlas/<name>.png + .json
+            manifest = os.path.join(self.base, "atlas", stem.rstrip("_") + ".json")
+            if os.path.exists(manifest):
+                with open(manifest) as f:
+                    atlas = json.load(f)
+                sheet = job("atlas/" + atlas["image"])
+                rects = atlas["frames"][:count]
+                return [bk.submit(f"{sheet}[{i}]", lambda s, r: s.subsurface(r).copy(), r,
+                                  deps=[sheet], stage="images") for i, r in enumerate(rects)]
+            return [job(f"{folder}/{stem}{i}.png") for i in range(1, count+1)]
+
+        # load once, every png is its own job
+        border = job(border_path)
+        fish = _load_seq("fishy", "fish__", fish_frame_count)
+        waka = _load_seq("waka", "waka__", waka_frame_count)
+        nets = _load_seq("waka", "wakanet__", net_frame_count)
+        stars = [job(f"stars/matariki_star_{i}.png") for i in range(1, star_count+1)]
+        wakes = [job(wake_big), job(wake_small), job(rowing_wake)]
+        bk.wait("images")
+        self.border       = bk.result(border)
+        self.fish_frames  = [bk.result(n) for n in fish]
+        self.waka_frames  = [bk.result(n) for n in waka]
+        self.net_frames   = [bk.result(n) for n in nets]
+        self.stars        = [bk.result(n) for n in stars]
+        self.wake_big, self.wake_small, self.rowing_wake = [bk.result(n) for n in wakes]
 
     def star_for_score(self, score):
         idx = max(0, min(score-1, len(self.stars)-1))
@@ -64,8 +251,90 @@ class ImagesKit:
         return [self.scaled(f, scale) for f in frames]
 
 
+class Timer:
+    __slots__ = ("due", "fn", "args", "period", "rounds", "cancelled", "scheduled")
+
+    def __init__(self, due, fn, args, period=None):
+        self.due, self.fn, self.args, self.period = due, fn, args, period
+        self.rounds, self.cancelled, self.scheduled = 0, False, False
+
+
+class TimerWheel:
+    # hashed timing wheel: O(1) schedule and cancel, advance only visits the slots that came due
+    def __init__(self, now_ms=0, tick_ms=16, slots=256, seed=None):
+        self.tick_ms, self.slots = tick_ms, slots
+        self.wheel = [[] for _ in range(slots)]
+        self.tick = int(now_ms // tick_ms)  # last tick processed
+        self.rng = random.Random(seed)
+        self.pending = self.fired = self.cancelled = 0
+
+    def at(self, due_ms, fn, *args, period=None):
+        t = Timer(due_ms, fn, args, period)
+        self._insert(t)
+        return t
+
+    def after(self, delay_ms, fn, *args):
+        return self.at(self.tick * self.tick_ms + delay_ms, fn, *args)
+
+    def every(self, period_ms, fn, *args):
+        return self.at(self.tick * self.tick_ms + period_ms, fn, *args, period=period_ms)
+
+    def cancel(self, t):
+        if t and not t.cancelled:
+            t.cancelled = True  # also stops a periodic timer cancelled from its own callback
+            if t.scheduled:
+                self.cancelled += 1
+            self._unschedule(t)
+
+    def _unschedule(self, t):
+        # each timer leaves pending once, whether it fired or was cancelled
+        if t.scheduled:
+            t.scheduled = False
+            self.pending -= 1
+
+    def _insert(self, t):
+        tick = max(-int(-t.due // self.tick_ms), self.tick + 1)  # never early
+        t.rounds = (tick - self.tick - 1) // self.slots
+        self.wheel[tick % self.slots].append(t)
+        t.scheduled = True
+        self.pending += 1
+
+    def advance(self, now_ms):
+        target = int(now_ms // self.tick_ms)
+        while self.tick < target:
+            self.tick += 1
+            i = self.tick % self.slots
+            slot = self.wheel[i]
+            if not slot:
+                continue
+            due, keep = [], []
+            for t in slot:
+                if t.cancelled:
+                    continue
+                if t.rounds:
+                    t.rounds -= 1
+                    keep.append(t)
+                else:
+                    due.append(t)
+            self.wheel[i] = keep
+            for t in due:
+                if t.cancelled:
+                    continue  # cancelled by an earlier callback this tick
+                self._unschedule(t)
+                self.fired += 1
+                t.fn(*t.args)
+                if t.period and not t.cancelled:
+                    t.due += t.period
+                    if t.due <= now_ms:
+                        t.due = now_ms + t.period  # don't replay a long stall
+                    self._insert(t)
+
+    def stats(self):
+        return {"pending": self.pending, "fired": self.fired, "cancelled": self.cancelled}
+
+
 class Waka:
-    def __init__(self, x, y, fps=8, splash_snds=None, frames=None, net_frames=None):
+    def __init__(self, x, y, fps=8, splash_snds=None, frames=None, net_frames=None, timers=None):
         assert frames and net_frames, "Pass frames from ImagesKit"
         self.x, self.y = x, y
         self.ang = -90
@@ -93,6 +362,9 @@ class Waka:
         self.net_state = "idle"     # idle, extending, held, retracting
         self.last_net_tick = pygame.time.get_ticks()
         self.net_frame_ms = 90
+        self.timers = timers
+        if timers:
+            timers.every(self.net_frame_ms, self._step_nets)
 
 
     def net_active(self):
@@ -129,8 +401,9 @@ class Waka:
     def update(self):
         now = pygame.time.get_ticks()
 
-        # nets animate first
-        self._update_nets()
+        # nets animate first, the wheel steps them when there is one
+        if not self.timers:
+            self._update_nets()
 
         # movement, cannot row if nets are out
         if self.stroking and not self.net_active() and now - self.stroke_start <= self.stroke_ms:
@@ -148,10 +421,10 @@ class Waka:
         # physics + wrap
         self.x += self.vx; self.y += self.vy
         self.vx *= FRICTION; self.vy *= FRICTION
-        if self.x < 0: self.x += W
-        if self.x > W: self.x -= W
-        if self.y < 0: self.y += H
-        if self.y > H: self.y -= H
+        if self.x < 0: self.x += WORLD_W
+        if self.x > WORLD_W: self.x -= WORLD_W
+        if self.y < 0: self.y += WORLD_H
+        if self.y > WORLD_H: self.y -= WORLD_H
 
 
     def _play_splash(self):
@@ -171,7 +444,9 @@ class Waka:
         if now - self.last_net_tick < self.net_frame_ms:
             return
         self.last_net_tick = now
+        self._step_nets()
 
+    def _step_nets(self):
         if self.net_state == "extending":
             if self.net_idx < 2:
                 self.net_idx += 1
@@ -183,28 +458,29 @@ class Waka:
             else:
                 self.net_state = "idle"
 
-    def draw(self, screen):
-        img = self.frames[self.frame_idx]
-        rotated = pygame.transform.rotate(img, -self.ang-90)
-        rect = rotated.get_rect(center=(self.x, self.y))
-        screen.blit(rotated, rect.topleft)
-
+    def draw(self, gfx, cam=None):
+        pos = cam.to_screen(self.x, self.y) if cam else (self.x, self.y)
+        gfx.draw(self.frames[self.frame_idx], pos, angle=-self.ang-90)
         if self.net_active():
-            net_img = self.net_frames[self.net_idx]
-            net_rot = pygame.transform.rotate(net_img, -self.ang-90)
-            net_rect = net_rot.get_rect(center=(self.x, self.y))
-            screen.blit(net_rot, net_rect.topleft)
+            gfx.draw(self.net_frames[self.net_idx], pos, angle=-self.ang-90)
 
-    def try_catch(self, fish):
+    def try_catch(self, fish, cam=None):
         if not fish or not self.net_active():
             return False
 
+        # positions via the camera so the wrap seam is handled
+        wx, wy = cam.to_screen(self.x, self.y) if cam else (self.x, self.y)
+        fx, fy = cam.to_screen(fish.x, fish.y) if cam else (fish.x, fish.y)
         net_img = self.net_frames[self.net_idx]
-        net_rot = pygame.transform.rotate(net_img, -self.ang-90)
-        net_rect = net_rot.get_rect(center=(int(self.x), int(self.y)))
-
         fish_img = fish.frames[fish.frame_idx]
-        fish_rect = fish_img.get_rect(center=(int(fish.x), int(fish.y)))
+        # broad phase before building masks
+        reach = (max(net_img.get_size()) + max(fish_img.get_size())) / 2
+        if abs(fx - wx) > reach or abs(fy - wy) > reach:
+            return False
+
+        net_rot = pygame.transform.rotate(net_img, -self.ang-90)
+        net_rect = net_rot.get_rect(center=(int(wx), int(wy)))
+        fish_rect = fish_img.get_rect(center=(int(fx), int(fy)))
 
         net_mask = pygame.mask.from_surface(net_rot)
         fish_mask = pygame.mask.from_surface(fish_img)
@@ -213,9 +489,182 @@ class Waka:
     
 
 
+class RotationCache:
+    # rotated frames and their masks, angles snapped to ROT_SPEED steps, shared by the fleet
+    def __init__(self, step=ROT_SPEED):
+        self.step = step
+        self.buckets = int(round(360 / step))
+        self._surfs = {}
+        self._masks = {}
+
+    def _key(self, img, angle):
+        return (id(img), int(round(angle / self.step)) % self.buckets)
+
+    def rotated(self, img, angle):
+        k = self._key(img, angle)
+        out = self._surfs.get(k)
+        if out is None:
+            out = self._surfs[k] = pygame.transform.rotate(img, k[1] * self.step)
+        return out
+
+    def mask(self, img, angle):
+        k = self._key(img, angle)
+        m = self._masks.get(k)
+        if m is None:
+            m = self._masks[k] = pygame.mask.from_surface(self.rotated(img, angle))
+        return m
+
+
+class RivalFleet:
+    # ai waka as numpy columns, one batched step per frame for steering, strokes and nets
+    IDLE, EXTENDING, HELD, RETRACTING = 0, 1, 2, 3
+
+    def __init__(self, n, frames, net_frames, seed=None, stroke_ms=300, stroke_thrust=0.336,
+                 net_frame_ms=90, net_range=70, rest_ms=(250, 700), tint=(150, 150, 170),
+                 rot_cache=None):
+        import numpy as np
+        self.np = np
+        self.n = n
+        self.frames = [self._tinted(f, tint) for f in frames]
+        self.net_frames = net_frames
+        self.stroke_ms, self.stroke_thrust = stroke_ms, stroke_thrust
+        self.stroke_frame_ms = max(1, int(stroke_ms / len(frames)))
+        self.net_frame_ms = net_frame_ms
+        self.net_range = net_range
+        self.rest_ms = rest_ms
+        self.rot = rot_cache or RotationCache()
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    @staticmethod
+    def _tinted(img, tint):
+        out = img.copy()
+        out.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+        return out
+
+    def reset(self, now=0):
+        np, n, rng = self.np, self.n, self.rng
+        self.x, self.y = rng.uniform(0, WORLD_W, n), rng.uniform(0, WORLD_H, n)
+        self.vx, self.vy = np.zeros(n), np.zeros(n)
+        self.ang = rng.uniform(-180, 180, n)
+        self.tx, self.ty = rng.uniform(0, WORLD_W, n), rng.uniform(0, WORLD_H, n)  # wander targets
+        self.frame_idx = np.zeros(n, int)
+        self.last_frame_tick = np.full(n, now, np.int64)
+        self.stroke_start = np.full(n, -10**9, np.int64)
+        self.rest = rng.integers(*self.rest_ms, n)
+        self.net_idx = np.zeros(n, int)
+        self.net_state = np.zeros(n, int)
+        self.last_net_tick = np.full(n, now, np.int64)
+        self.score = np.zeros(n, int)
+
+    def _delta(self, tx, ty):
+        # shortest way round the wrapping world
+        dx = (tx - self.x + WORLD_W / 2) % WORLD_W - WORLD_W / 2
+        dy = (ty - self.y + WORLD_H / 2) % WORLD_H - WORLD_H / 2
+        return dx, dy
+
+    def net_active(self):
+        st = self.net_state
+        return (self.net_idx > 0) | (st == self.EXTENDING) | (st == self.HELD)
+
+    def update(self, now, fish=None):
+        np, n = self.np, self.n
+        if fish:
+            dx, dy = self._delta(fish.x, fish.y)
+        else:
+            dx, dy = self._delta(self.tx, self.ty)
+            arrived = np.hypot(dx, dy) < 80
+            self.tx[arrived] = self.rng.uniform(0, WORLD_W, arrived.sum())
+            self.ty[arrived] = self.rng.uniform(0, WORLD_H, arrived.sum())
+        dist = np.hypot(dx, dy)
+
+        # steering, same turn rate as the player
+        diff = (np.degrees(np.arctan2(dy, dx)) - self.ang + 180) % 360 - 180
+        self.ang += np.clip(diff, -ROT_SPEED, ROT_SPEED)
+
+        # nets, mirrors Waka._update_nets
+        st = self.net_state
+        want = dist < self.net_range if fish else np.zeros(n, bool)
+        st[want & ((st == self.IDLE) | (st == self.RETRACTING))] = self.EXTENDING
+        st[~want & ((st == self.EXTENDING) | (st == self.HELD))] = self.RETRACTING
+        due = now - self.last_net_tick >= self.net_frame_ms
+        self.last_net_tick[due] = now
+        ext = due & (st == self.EXTENDING)
+        grow = ext & (self.net_idx < len(self.net_frames) - 1)
+        self.net_idx[grow] += 1
+        st[ext & ~grow] = self.HELD
+        ret = due & (st == self.RETRACTING)
+        shrink = ret & (self.net_idx > 0)
+        self.net_idx[shrink] -= 1
+        st[ret & ~shrink] = self.IDLE
+        nets = self.net_active()
+
+        # strokes, can't row with nets out
+        start = (~nets & (now - self.stroke_start > self.stroke_ms + self.rest)
+                 & (np.abs(diff) < 45) & (dist > self.net_range))
+        self.stroke_start[start] = now
+        rowing = ~nets & (now - self.stroke_start <= self.stroke_ms)
+        r = np.radians(self.ang)
+        self.vx += np.where(rowing, np.cos(r) * self.stroke_thrust, 0.0)
+        self.vy += np.where(rowing, np.sin(r) * self.stroke_thrust, 0.0)
+        adv = rowing & (now - self.last_frame_tick >= self.stroke_frame_ms)
+        self.frame_idx[adv] = (self.frame_idx[adv] + 1) % len(self.frames)
+        self.last_frame_tick[adv] = now
+        self.frame_idx[~rowing] = 0
+        if fish:
+            close = dist < self.net_range * 1.5
+            self.vx[close] *= BRAKE; self.vy[close] *= BRAKE
+
+        # physics + wrap
+        self.x = (self.x + self.vx) % WORLD_W
+        self.y = (self.y + self.vy) % WORLD_H
+        self.vx *= FRICTION; self.vy *= FRICTION
+
+    def try_catch(self, fish):
+        # index of the waka that netted the fish, or -1
+        if not fish:
+            return -1
+        np = self.np
+        fish_img = fish.frames[fish.frame_idx]
+        reach = (max(self.net_frames[-1].get_size()) + max(fish_img.get_size())) / 2
+        dx, dy = self._delta(fish.x, fish.y)
+        near = np.flatnonzero(self.net_active() & (np.abs(dx) < reach) & (np.abs(dy) < reach))
+        if not len(near):
+            return -1
+        fish_mask = pygame.mask.from_surface(fish_img)
+        for i in near.tolist():
+            net_img = self.net_frames[self.net_idx[i]]
+            a = -self.ang[i] - 90
+            net_rect = self.rot.rotated(net_img, a).get_rect(center=(0, 0))
+            fish_rect = fish_img.get_rect(center=(int(dx[i]), int(dy[i])))
+            offset = (fish_rect.left - net_rect.left, fish_rect.top - net_rect.top)
+            if self.rot.mask(net_img, a).overlap(fish_mask, offset) is not None:
+                return i
+        return -1
+
+    def best(self):
+        return int(self.score.max()) if self.n else 0
+
+    def draw(self, gfx, cam=None):
+        nets = self.net_active().tolist()
+        reach = max(self.frames[0].get_size())
+        for i, (x, y, ang, fi, ni) in enumerate(zip(self.x.tolist(), self.y.tolist(), self.ang.tolist(),
+                                                    self.frame_idx.tolist(), self.net_idx.tolist())):
+            if cam and not cam.visible(x, y, reach):
+                continue
+            pos = cam.to_screen(x, y) if cam else (x, y)
+            a = -ang - 90
+            imgs = (self.frames[fi], self.net_frames[ni]) if nets[i] else (self.frames[fi],)
+            for img in imgs:
+                if gfx.rotates_free:
+                    gfx.draw(img, pos, angle=a)
+                else:
+                    gfx.draw(self.rot.rotated(img, a), pos)
+
+
 class Fish:
     def __init__(self, x, y, base_frames, splash_snds=None,
-                 life=FISH_LIFE, scale=1.0):
+                 life=FISH_LIFE, scale=1.0, timers=None):
         self.x, self.y = float(x), float(y)
         self.life = float(life)
         self.birth = time.time()
@@ -234,6 +683,17 @@ class Fish:
         self.spawn_tick = pygame.time.get_ticks()
         self.splash_played = False
         self.splash_delay_ms = self.splash_delay_ms = int(500 * self.life + 500)
+        self.timers = timers
+        self.gone = False
+        self.splash_timer = None
+        if timers and self.splash_snds:
+            self.splash_timer = timers.after(self.splash_delay_ms, self._maybe_play_splash, None)
+
+    def remove(self):
+        # caught or expired, no splash after it has left play
+        self.gone = True
+        if self.timers:
+            self.timers.cancel(self.splash_timer)
 
     @property
     def alive(self):
@@ -243,19 +703,23 @@ class Fish:
         now_s = time.time()
         p = max(0.0, min(1.0, (now_s - self.birth) / self.life))
         self.frame_idx = min(int(p * self.n_frames), self.n_frames - 1)
-        self._maybe_play_splash(pygame.time.get_ticks())
+        if not self.timers:
+            self._maybe_play_splash(pygame.time.get_ticks())
 
     def _maybe_play_splash(self, now_ms):
-        if self.splash_played or not self.alive or not self.splash_snds:
+        # now_ms None when the wheel calls us at the deadline
+        if self.splash_played or self.gone or not self.alive or not self.splash_snds:
             return
-        if now_ms - self.spawn_tick >= self.splash_delay_ms:
+        if now_ms is None or now_ms - self.spawn_tick >= self.splash_delay_ms:
             random.choice(self.splash_snds).play()
             self.splash_played = True
 
-    def draw(self, screen):
+    def draw(self, gfx, cam=None):
         img = self.frames[self.frame_idx]
-        rect = img.get_rect(center=(int(self.x), int(self.y)))
-        screen.blit(img, rect.topleft)
+        if cam and not cam.visible(self.x, self.y, max(img.get_size())):
+            return
+        x, y = cam.to_screen(self.x, self.y) if cam else (self.x, self.y)
+        gfx.draw(img, (int(x), int(y)))
 
 
 class CatchEffect:
@@ -269,41 +733,50 @@ class CatchEffect:
 
     @classmethod
     def _get_frames(cls, star, steps):
+        key = (id(star), steps, star.get_width(), star.get_height())
+        if key not in cls._cache:
+            cls._cache[key] = [cls._frame(star, i, steps) for i in range(steps)]
+        return cls._cache[key]
+
+    @staticmethod
+    def _frame(star, i, steps):
         w, h = star.get_width(), star.get_height()
-        key = (id(star), steps, w, h)
-        if key in cls._cache:
-            return cls._cache[key]
-        out = []
-        for i in range(steps):
-            p = (i+1)/steps
-            s = 0.6 + 0.4*math.sin(p*math.pi)
-            out.append(pygame.transform.smoothscale(star, (int(w*s), int(h*s))))
-        cls._cache[key] = out
-        return out
+        p = (i+1)/steps
+        s = 0.6 + 0.4*math.sin(p*math.pi)
+        # frame i shows over p in [i, i+1)/(steps-1), bake the fade for its middle
+        alpha = 255*(1.0 - min(1.0, (i + 0.5)/(steps - 1)))
+        return fade(pygame.transform.smoothscale(star, (int(w*s), int(h*s))), alpha)
+
+    @classmethod
+    def prebake(cls, baker, stars, steps=12, stage="derived"):
+        # one job per star, the frames land in the cache in wait()
+        for star in stars:
+            key = (id(star), steps, star.get_width(), star.get_height())
+            baker.submit(("catch", key), lambda s: [cls._frame(s, i, steps) for i in range(steps)],
+                         star, stage=stage, done=lambda frames, key=key: cls._cache.__setitem__(key, frames))
 
     def update(self, dt):
         self.t += dt
         if self.t > self.flash_ms + self.star_ms:
             self.done = True
 
-    def draw(self, screen):
+    def draw(self, gfx, cam=None):
+        if cam and not cam.visible(self.x, self.y, max(self.frames[-1].get_size())):
+            return
+        x, y = cam.to_screen(self.x, self.y) if cam else (self.x, self.y)
         if self.t <= self.flash_ms:
             p = self.t / self.flash_ms
             size = int(20 + 80*p)
-            rect = pygame.Rect(0,0,size,size); rect.center = (self.x,self.y)
-            pygame.draw.rect(screen, BRT_WHITE, rect, width=3)
+            rect = pygame.Rect(0,0,size,size); rect.center = (x,y)
+            gfx.rect(BRT_WHITE, rect, width=3)
             return
 
         p = min(1.0, (self.t - self.flash_ms)/self.star_ms)
         idx = min(int(p*(len(self.frames)-1)), len(self.frames)-1)
         img = self.frames[idx]
 
-        # soft fade out
-        alpha = int(255*(1.0 - p))
-        prev_alpha = img.get_alpha()
-        img.set_alpha(alpha)
-        screen.blit(img, img.get_rect(center=(self.x,self.y)))
-        img.set_alpha(prev_alpha)
+        # soft fade out, baked into the frames
+        gfx.draw(img, (x, y))
 
 
 class WakeTrail:
@@ -322,6 +795,9 @@ class WakeTrail:
         now = pygame.time.get_ticks()
         if now - self.last_spawn < self.spawn_ms: return
         self.last_spawn = now
+        self.emit(x, y, ang)
+
+    def emit(self, x, y, ang):
         # drop a bit behind the waka nose
         r = math.radians(ang)
         px = x - math.cos(r)*self.back_offset
@@ -333,25 +809,967 @@ class WakeTrail:
         for p in self.parts: p["t"] += dt
         self.parts = [p for p in self.parts if p["t"] < self.life_ms]
 
-    def draw(self, screen):
+    def draw(self, gfx, cam=None):
+        reach = max(self.img.get_size()) * self.end_scale * 1.5  # rotated diagonal
         for p in self.parts:
+            if cam and not cam.visible(p["x"], p["y"], reach):
+                continue
+            x, y = cam.to_screen(p["x"], p["y"]) if cam else (p["x"], p["y"])
             # wakes grow over time
             prog = max(0.0, min(1.0, p["t"] / self.life_ms))
             s = self.start_scale + (self.end_scale - self.start_scale) * prog
             alpha = int(160 * (1.0 - prog))
             # Fade out
-            img = pygame.transform.rotozoom(self.img, -p["ang"]-90, s)
-            img.set_alpha(alpha)
-            screen.blit(img, img.get_rect(center=(p["x"], p["y"])))
+            gfx.draw(self.img, (x, y), angle=-p["ang"]-90, scale=s, alpha=alpha)
+
+
+class OceanLayer:
+    # a loop of seamless 8-bit tiles baked once with numpy, the palette is the colour lookup
+    # so retinting to the time of day never touches pixels
+    def __init__(self, tile=384, frames=16, frame_ms=110, drift=(14, 6), levels=32, seed=7, baker=None):
+        import numpy as np
+        self.tile, self.frame_ms, self.drift, self.levels = tile, frame_ms, drift, levels
+        rng = random.Random(seed)
+        u = np.arange(tile, dtype=np.float32) * np.float32(2 * np.pi / tile)
+        x, y = np.meshgrid(u, u, indexing="ij")  # surfarray is [x][y]
+
+        def basis(n, kmin, kmax, amp):
+            # integer wave numbers keep the tile seamless, integer time rates keep the loop seamless.
+            # sin(a + w*t) = sin a cos wt + cos a sin wt, so frames are only multiply-adds
+            out = []
+            for _ in range(n):
+                kx, ky = rng.randint(-kmax, kmax), rng.randint(kmin, kmax)
+                a = kx*x + ky*y + np.float32(rng.uniform(0, 2*math.pi))
+                k = amp / math.hypot(kx, ky)
+                out.append((k * np.sin(a), k * np.cos(a), rng.choice((-2, -1, 1, 2))))
+            return out
+
+        self.swell = basis(5, 1, 3, 0.6) + basis(8, 4, 9, 2.0)
+        self.norm = sum(float(np.abs(s).max()) for s, _, _ in self.swell)
+        # sparse 2x2 sparkles, they light up as crests pass over them
+        noise = np.random.default_rng(seed).random((tile // 2, tile // 2), dtype=np.float32)
+        self.sparkle = noise.repeat(2, 0).repeat(2, 1) > 0.95
+        bk = baker or AssetBaker(threaded=False)
+        names = [bk.submit(("ocean", i), self._bake, i, frames, stage="ocean") for i in range(frames)]
+        bk.wait("ocean")
+        self.frames = [bk.result(n) for n in names]
+        self._tint, self._dirty = None, set()
+
+    @staticmethod
+    def _sum(waves, th):
+        h = 0
+        for s, c, w in waves:
+            h = h + s * math.cos(w * th) + c * math.sin(w * th)
+        return h
+
+    def _bake(self, i, n):
+        import numpy as np
+        th = 2 * math.pi * i / n
+        h = 0.5 + 0.5 * self._sum(self.swell, th) / self.norm
+        idx = (np.clip(h, 0, 1) ** 2 * (self.levels - 1)).astype(np.uint8)
+        idx[self.sparkle & (h > 0.6)] = self.levels  # sun glints on the crests
+        return pygame.surfarray.make_surface(idx)
+
+    def lut(self, sky):
+        # troughs are ocean blue dimmed with the light, crests reflect the sky
+        lum = max(sky) / 255
+        deep = [b * (0.3 + 0.7 * lum) for b in OCEAN_BLUE]
+        crest = [d * 0.4 + c * 0.6 for d, c in zip(deep, sky)]
+        ramp = [tuple(int(d + (c - d) * j / (self.levels - 1)) for d, c in zip(deep, crest))
+                for j in range(self.levels)]
+        k = 0.2 + 0.7 * lum
+        glint = tuple(int(c + (250 - c) * k) for c in crest)
+        return ramp + [glint] * (256 - self.levels)
+
+    def tint(self, sky):
+        key = tuple(c >> 2 for c in sky)
+        if key == self._tint:
+            return
+        self._tint = key
+        pal = self.lut(sky)
+        for f in self.frames:
+            f.set_palette(pal)
+        self._dirty = set(range(len(self.frames)))  # textures catch up one frame at a time
+
+    def draw(self, gfx, sky, origin=(0, 0), now_ms=None):
+        now_ms = pygame.time.get_ticks() if now_ms is None else now_ms
+        self.tint(sky)
+        i = now_ms // self.frame_ms % len(self.frames)
+        ox = int(origin[0] + now_ms * self.drift[0] / 1000) % self.tile
+        oy = int(origin[1] + now_ms * self.drift[1] / 1000) % self.tile
+        gfx.tile(self.frames[i], (-ox, -oy), refresh=i in self._dirty)
+        self._dirty.discard(i)
+
+
+def make_ocean(baker=None):
+    try:
+        return OceanLayer(baker=baker)
+    except ImportError as e:
+        print("Ocean unavailable, flat sky instead:", e)
+        return None
+
+
+class Camera:
+    # follows the waka around a wrapping world, identity when the world fits the screen
+    def __init__(self, view_w=W, view_h=H, world_w=None, world_h=None):
+        self.view_w, self.view_h = view_w, view_h
+        self.world_w = world_w or WORLD_W
+        self.world_h = world_h or WORLD_H
+        self.scrolls = self.world_w > view_w or self.world_h > view_h
+        self.cx, self.cy = view_w / 2, view_h / 2
+        self.ux, self.uy = self.cx, self.cy  # never wraps, so tiled layers stay seamless
+        self.culled = 0
+
+    def follow(self, x, y):
+        if self.scrolls:
+            ww, wh = self.world_w, self.world_h
+            self.ux += (x - self.cx + ww / 2) % ww - ww / 2
+            self.uy += (y - self.cy + wh / 2) % wh - wh / 2
+            self.cx, self.cy = x, y
+
+    def origin(self):
+        # world position of the top-left of the view
+        return ((self.cx - self.view_w / 2) % self.world_w,
+                (self.cy - self.view_h / 2) % self.world_h)
+
+    def scroll(self):
+        # unwrapped top-left, for layers whose period doesn't divide the world
+        return self.ux - self.view_w / 2, self.uy - self.view_h / 2
+
+    def to_screen(self, x, y):
+        if not self.scrolls:
+            return x, y
+        ww, wh = self.world_w, self.world_h
+        dx = (x - self.cx + ww / 2) % ww - ww / 2
+        dy = (y - self.cy + wh / 2) % wh - wh / 2
+        return dx + self.view_w / 2, dy + self.view_h / 2
+
+    def visible(self, x, y, reach):
+        if not self.scrolls:
+            return True
+        sx, sy = self.to_screen(x, y)
+        if -reach < sx < self.view_w + reach and -reach < sy < self.view_h + reach:
+            return True
+        self.culled += 1
+        return False
+
+
+class SurfaceRenderer:
+    # software blits to the display surface, rotation and scaling on the cpu
+    name = "surface"
+    rotates_free = False
+
+    def __init__(self, size, premultiplied=False, fade_levels=16):
+        self.screen = pygame.display.set_mode(size)
+        self.premultiplied = premultiplied
+        self.blend = pygame.BLEND_PREMULTIPLIED if self.premultiplied else 0
+        self.fade_step = 256 // fade_levels
+        self._fades = {}  # (id(surface), level) -> (surface, faded copy)
+
+    def get_size(self):
+        return self.screen.get_size()
+
+    def fill(self, color):
+        self.screen.fill(color)
+
+    def blit(self, surf, dest, transient=False):
+        # straight alpha surfaces, i.e. rendered text
+        self.screen.blit(surf, dest)
+
+    def faded(self, img, alpha):
+        level = int(alpha) // self.fade_step
+        hit = self._fades.get((id(img), level))
+        if hit and hit[0] is img:
+            return hit[1]
+        out = fade(img, min(255, level * self.fade_step + self.fade_step // 2), self.premultiplied)  # bucket midpoint
+        self._fades[(id(img), level)] = (img, out)
+        return out
+
+    def draw(self, img, center, angle=0.0, scale=1.0, alpha=None):
+        # angle is counter-clockwise degrees, same as transform.rotate
+        if alpha is not None and alpha < 255:
+            if alpha <= 0:
+                return
+            img = self.faded(img, alpha)
+        if scale != 1.0:
+            img = pygame.transform.rotozoom(img, angle, scale)
+        elif angle:
+            img = pygame.transform.rotate(img, angle)
+        self.screen.blit(img, img.get_rect(center=center), special_flags=self.blend)
+
+    def tile(self, img, offset, refresh=False):
+        # cover the screen with img starting at offset, one fblits call
+        w, h = img.get_size()
+        sw, sh = self.screen.get_size()
+        self.screen.fblits([(img, (x, y)) for y in range(offset[1], sh, h) for x in range(offset[0], sw, w)])
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.screen, color, rect, width=width)
+
+    def present(self):
+        pygame.display.flip()
+
+    def present_screen(self):
+        pygame.display.flip()
+
+
+class TextureRenderer:
+    # pygame._sdl2 Renderer, each asset uploaded once and drawn with angle/scale/alpha
+    name = "texture"
+    rotates_free = True
+    premultiplied = False
+    blend = 0
+
+    def __init__(self, size, title="pygame window", accelerated=True, vsync=False):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        self._Texture = Texture
+        # hidden display surface so convert()/convert_alpha() keep working
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.window = Window(title, size)
+        try:
+            self.renderer = Renderer(self.window, accelerated=1 if accelerated else 0, vsync=vsync)
+        except Exception:
+            # sdl software renderer, works on headless linux
+            self.renderer = Renderer(self.window, accelerated=0)
+        self.size = size
+        self.screen = pygame.Surface(size)  # ui canvas, uploaded by present_screen
+        self._screen_tex = None
+        self._textures = {}  # id(surface) -> (surface, texture)
+
+    def get_size(self):
+        return self.size
+
+    def texture(self, surf):
+        hit = self._textures.get(id(surf))
+        if hit and hit[0] is surf:
+            return hit[1]
+        tex = self._Texture.from_surface(self.renderer, surf)
+        tex.blend_mode = pygame.BLENDMODE_BLEND
+        self._textures[id(surf)] = (surf, tex)  # keep surf alive so the id stays unique
+        return tex
+
+    def fill(self, color):
+        self.renderer.draw_color = color
+        self.renderer.clear()
+
+    def blit(self, surf, dest, transient=False):
+        tex = self._Texture.from_surface(self.renderer, surf) if transient else self.texture(surf)
+        tex.draw(dstrect=pygame.Rect(dest, surf.get_size()))
+
+    def draw(self, img, center, angle=0.0, scale=1.0, alpha=None):
+        tex = self.texture(img)
+        tex.alpha = 255 if alpha is None else alpha
+        w, h = img.get_width() * scale, img.get_height() * scale
+        dst = pygame.Rect(0, 0, int(w), int(h)); dst.center = center
+        tex.draw(dstrect=dst, angle=-angle)  # sdl rotates clockwise
+
+    def tile(self, img, offset, refresh=False):
+        # refresh re-uploads img after its palette changed
+        tex = self.texture(img)
+        if refresh:
+            tex.update(img)
+        tex.blend_mode = pygame.BLENDMODE_NONE  # tiles are opaque
+        w, h = img.get_size()
+        for y in range(offset[1], self.size[1], h):
+            for x in range(offset[0], self.size[0], w):
+                tex.draw(dstrect=(x, y, w, h))
+
+    def rect(self, color, rect, width=0):
+        self.renderer.draw_color = color
+        if not width:
+            self.renderer.fill_rect(rect)
+            return
+        r = pygame.Rect(rect)
+        for _ in range(width):
+            self.renderer.draw_rect(r)
+            r.inflate_ip(-2, -2)
+
+    def present(self):
+        self.renderer.present()
+
+    def present_screen(self):
+        if self._screen_tex is None:
+            self._screen_tex = self._Texture(self.renderer, self.size, streaming=True)
+        self._screen_tex.update(self.screen)
+        self._screen_tex.draw()
+        self.renderer.present()
+
+
+def make_renderer(size, backend=RENDERER, premultiply=PREMULTIPLY):
+    global PREMULTIPLIED
+    gfx = None
+    if backend == "texture":
+        try:
+            gfx = TextureRenderer(size)
+        except Exception as e:
+            # e.g. no _sdl2 in the pygbag build
+            print("Texture renderer unavailable, using surfaces:", e)
+    if gfx is None:
+        gfx = SurfaceRenderer(size, premultiplied=premultiply)
+    # assets loaded after this follow the renderer's blending
+    PREMULTIPLIED = gfx.premultiplied
+    return gfx
+
+
+class InputLatencyProbe:
+    # action -> (event type, keys, what to watch on the waka)
+    ACTIONS = {
+        "row":       (pygame.KEYDOWN, (pygame.K_UP,), lambda w: w.rowing),
+        "turn":      (pygame.KEYDOWN, (pygame.K_LEFT, pygame.K_RIGHT), lambda w: w.ang),
+        "net_open":  (pygame.KEYDOWN, (pygame.K_SPACE,), lambda w: w.net_idx),
+        "net_close": (pygame.KEYUP,   (pygame.K_SPACE,), lambda w: w.net_idx),
+    }
+    BUCKETS_MS = (8, 17, 33, 50, 67, 100, 150, 250)
+
+    def __init__(self, timeout_ms=1000, clock=time.perf_counter):
+        self.clock = clock
+        self.timeout_ms = timeout_ms
+        self.frame = 0
+        self.pending = []    # [action, t_poll, frame_polled, watched value]
+        self.reflected = []  # [action, t_poll, frame_polled, t_sim, frame_sim]
+        self.samples = {a: {"sim": [], "present": [], "frames": []} for a in self.ACTIONS}
+        self.dropped = {a: 0 for a in self.ACTIONS}
+
+    def poll(self, e, waka):
+        # stamp as soon as the event comes off the queue
+        t = self.clock()
+        for action, (etype, keys, watch) in self.ACTIONS.items():
+            if e.type == etype and e.key in keys:
+                self.pending.append([action, t, self.frame, watch(waka)])
+
+    def mark_sim(self, waka):
+        # call once per frame right after the simulation step
+        t = self.clock()
+        self.frame += 1
+        still = []
+        for action, t0, f0, before in self.pending:
+            if self.ACTIONS[action][2](waka) != before:
+                self.reflected.append([action, t0, f0, t, self.frame])
+            elif (t - t0) * 1000 > self.timeout_ms:
+                self.dropped[action] += 1   # ignored, e.g. row with nets out
+            else:
+                still.append([action, t0, f0, before])
+        self.pending = still
+
+    def mark_flip(self):
+        # call right after display.flip
+        t = self.clock()
+        for action, t0, f0, t_sim, f_sim in self.reflected:
+            s = self.samples[action]
+            s["sim"].append((t_sim - t0) * 1000)
+            s["present"].append((t - t0) * 1000)
+            s["frames"].append(f_sim - f0)
+        self.reflected = []
+
+    @staticmethod
+    def _pct(vals, q):
+        vals = sorted(vals)
+        return vals[min(len(vals)-1, int(q * len(vals)))] if vals else 0.0
+
+    def histogram(self, vals):
+        edges = self.BUCKETS_MS + (float("inf"),)
+        hist = {e: 0 for e in edges}
+        for v in vals:
+            for e in edges:
+                if v <= e:
+                    hist[e] += 1
+                    break
+        return hist
+
+    def report(self):
+        out = {}
+        for action, s in self.samples.items():
+            out[action] = {
+                "n": len(s["present"]),
+                "dropped": self.dropped[action],
+                "sim_p50": self._pct(s["sim"], 0.5),
+                "present_p50": self._pct(s["present"], 0.5),
+                "present_p95": self._pct(s["present"], 0.95),
+                "present_max": max(s["present"], default=0.0),
+                "frames_p50": self._pct(s["frames"], 0.5),
+                "hist": self.histogram(s["present"]),
+            }
+        return out
+
+    def format_report(self):
+        lines = ["input latency (ms, poll -> flip)"]
+        for action, r in self.report().items():
+            hist = " ".join(f"<={e:g}:{n}" for e, n in r["hist"].items() if n)
+            lines.append(f"  {action:<9} n={r['n']:<4} dropped={r['dropped']:<3} "
+                         f"sim50={r['sim_p50']:.1f} p50={r['present_p50']:.1f} "
+                         f"p95={r['present_p95']:.1f} max={r['present_max']:.1f} "
+                         f"frames50={r['frames_p50']}  {hist}")
+        return "\n".join(lines)
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, batch):
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(r) + "\n" for r in batch)
+
+    def close(self):
+        pass
+
+
+class SqliteSink:
+    def __init__(self, path):
+        import sqlite3
+        # only ever touched from the single flush worker, or inline
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS events (t REAL, ev TEXT, data TEXT)")
+
+    def write(self, batch):
+        self.conn.executemany("INSERT INTO events VALUES (?,?,?)",
+                              [(r["t"], r["ev"], json.dumps(r)) for r in batch])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class BrowserStorageSink:
+    # pygbag build, one localStorage key per batch in a ring of slots, so a flush writes
+    # only its own lines; read back from key:head-slots up to key:head-1
+    def __init__(self, key="waka_telemetry", max_chars=1_000_000, slots=64):
+        from platform import window
+        self.storage = window.localStorage
+        self.key = key
+        self.slots = slots
+        self.slot_chars = max_chars // slots
+        self.head = int(self.storage.getItem(key + ":head") or 0)  # carry on after a reload
+
+    def write(self, batch):
+        chunk = "".join(json.dumps(r) + "\n" for r in batch)
+        if len(chunk) > self.slot_chars:
+            chunk = chunk[-self.slot_chars:]
+            chunk = chunk[chunk.find("\n")+1:]  # keep whole lines
+        self.storage.setItem(f"{self.key}:{self.head % self.slots}", chunk)
+        self.head += 1
+        self.storage.setItem(self.key + ":head", str(self.head))
+
+    def close(self):
+        pass
+
+
+class Telemetry:
+    # emit() is a bounded deque append, all encoding and io happens in flush()
+    def __init__(self, sink, capacity=4096, batch_size=256, flush_ms=1000, frame_window=120):
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.buf = collections.deque()
+        self.dropped = 0
+        self.written = 0
+        self.closed = False
+        self.frame_window = frame_window
+        self._dts = []
+        self._pool = None
+        if sys.platform != "emscripten":
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=1)
+        atexit.register(self.close)
+
+    @classmethod
+    def for_platform(cls, path=TELEMETRY_PATH, **kw):
+        if not path:
+            return None
+        if sys.platform == "emscripten":
+            return cls(BrowserStorageSink(), **kw)
+        if path.endswith((".db", ".sqlite")):
+            return cls(SqliteSink(path), **kw)
+        return cls(JsonlSink(path), **kw)
+
+    def emit(self, ev, **fields):
+        if len(self.buf) >= self.capacity:
+            self.dropped += 1   # backpressure, sink is behind
+            return
+        self.buf.append((time.time(), ev, fields))
+
+    def frame(self, dt):
+        self._dts.append(dt)
+        if len(self._dts) >= self.frame_window:
+            d = sorted(self._dts); self._dts = []
+            self.emit("frames", n=len(d), avg_ms=sum(d)/len(d),
+                      p95_ms=d[int(0.95*(len(d)-1))], max_ms=d[-1])
+
+    def _take(self):
+        n = min(self.batch_size, len(self.buf))
+        out = []
+        for _ in range(n):
+            t, ev, fields = self.buf.popleft()
+            out.append({"t": t, "ev": ev, **fields})
+        return out
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        while self.buf:
+            batch = self._take()
+            if self._pool:
+                await loop.run_in_executor(self._pool, self.sink.write, batch)
+            else:
+                self.sink.write(batch)
+                await asyncio.sleep(0)  # one batch per frame at most
+            self.written += len(batch)
+
+    async def run(self):
+        while not self.closed:
+            await asyncio.sleep(self.flush_ms / 1000)
+            try:
+                await self.flush()
+            except Exception as e:
+                print("Telemetry flush failed:", e)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.dropped:
+            self.buf.append((time.time(), "dropped", {"n": self.dropped}))
+        if self._pool:
+            self._pool.shutdown(wait=True)
+        try:
+            while self.buf:
+                batch = self._take()
+                self.sink.write(batch)
+                self.written += len(batch)
+            self.sink.close()
+        except Exception as e:
+            print("Telemetry close failed:", e)
+
+
+class LoopbackNet:
+    # in-process stand-in for udp with latency, jitter and loss, for tests and the bench
+    def __init__(self, latency_ms=0, jitter_ms=0, loss=0.0, seed=None, clock=None):
+        self.latency_ms, self.jitter_ms, self.loss = latency_ms, jitter_ms, loss
+        self.rng = random.Random(seed)
+        self.clock = clock or pygame.time.get_ticks
+        self.queues = collections.defaultdict(list)  # addr -> heap of (due, n, data, src)
+        self._n = 0
+
+    def endpoint(self, addr):
+        return LoopbackEndpoint(self, addr)
+
+    def _send(self, data, src, dst):
+        if self.rng.random() < self.loss:
+            return
+        due = self.clock() + self.latency_ms + self.rng.uniform(0, self.jitter_ms)
+        self._n += 1
+        heapq.heappush(self.queues[dst], (due, self._n, data, src))
+
+    def _recv(self, addr):
+        q, now, out = self.queues[addr], self.clock(), []
+        while q and q[0][0] <= now:
+            _, _, data, src = heapq.heappop(q)
+            out.append((data, src))
+        return out
+
+
+class LoopbackEndpoint:
+    def __init__(self, net, addr):
+        self.net, self.addr = net, addr
+
+    def send(self, data, addr):
+        self.net._send(data, self.addr, addr)
+
+    def recv(self):
+        return self.net._recv(self.addr)
+
+
+class UdpTransport:
+    # non-blocking socket, drained once a frame from the game loop
+    def __init__(self, bind=("0.0.0.0", 0)):
+        import socket
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind(bind)
+
+    def send(self, data, addr):
+        try:
+            self.sock.sendto(data, addr)
+        except OSError:
+            pass  # full buffer or unreachable, the next tick resends state anyway
+
+    def recv(self):
+        out = []
+        while True:
+            try:
+                out.append(self.sock.recvfrom(2048))
+            except (BlockingIOError, InterruptedError):
+                return out
+            except OSError:
+                return out  # e.g. icmp port unreachable on windows
+
+
+class SnapshotCodec:
+    # quantised player and fish state, delta coded against a baseline snapshot
+    NET_STATES = ("idle", "extending", "held", "retracting")
+    FIELDS = (("x", "H"), ("y", "H"), ("vx", "h"), ("vy", "h"), ("ang", "H"),
+              ("net", "B"), ("frame", "B"), ("score", "B"))
+    POS_Q = min(2, 65535 / max(WORLD_W, WORLD_H))  # half pixels, coarser when the world outgrows a u16
+    VEL_Q = 64                                     # 1/64 px per frame
+    ANG_Q = 65536 / 360.0
+    NO_BASE = 0xFFFFFFFF
+    HEAD = "<cIIBBH"  # kind, tick, base tick, flags, round, seconds left
+
+    @classmethod
+    def _pos(cls, v):
+        return max(0, min(65535, int(round(v * cls.POS_Q))))
+
+    @classmethod
+    def quantise(cls, waka, score):
+        clamp = lambda v, lo, hi: max(lo, min(hi, int(round(v))))
+        return (cls._pos(waka.x), cls._pos(waka.y),
+                clamp(waka.vx * cls.VEL_Q, -32768, 32767), clamp(waka.vy * cls.VEL_Q, -32768, 32767),
+                int(round((waka.ang % 360) * cls.ANG_Q)) % 65536,
+                cls.NET_STATES.index(waka.net_state) << 2 | waka.net_idx,
+                waka.frame_idx, min(255, score))
+
+    @classmethod
+    def dequantise(cls, p):
+        x, y, vx, vy, ang, net, frame, score = p
+        return {"x": x / cls.POS_Q, "y": y / cls.POS_Q, "vx": vx / cls.VEL_Q, "vy": vy / cls.VEL_Q,
+                "ang": ang / cls.ANG_Q, "net_state": cls.NET_STATES[net >> 2], "net_idx": net & 3,
+                "frame": frame, "score": score}
+
+    @classmethod
+    def quantise_fish(cls, fish_id, fish):
+        if not fish:
+            return (0, 0, 0, 0)
+        return (fish_id, cls._pos(fish.x), cls._pos(fish.y), fish.frame_idx)
+
+    @classmethod
+    def encode(cls, tick, snap, base=None, base_tick=None):
+        # snap = {"fish": (id, x, y, frame), "players": {pid: quantised tuple}, "meta": (round, over, secs)}
+        base = base or {"fish": None, "players": {}}
+        fish_changed = snap["fish"] != base["fish"]
+        rnd, over, secs = snap["meta"]
+        out = [struct.pack(cls.HEAD, b"S", tick, cls.NO_BASE if base_tick is None else base_tick,
+                           (1 if fish_changed else 0) | (2 if over else 0), rnd, secs)]
+        if fish_changed:
+            out.append(struct.pack("<HHHB", *snap["fish"]))
+        changed = []
+        for pid, p in snap["players"].items():
+            old = base["players"].get(pid)
+            mask = 0
+            for i in range(len(cls.FIELDS)):
+                if old is None or p[i] != old[i]:
+                    mask |= 1 << i
+            if mask:
+                changed.append(struct.pack("<BB", pid, mask) + b"".join(
+                    struct.pack("<" + f, p[i]) for i, (_, f) in enumerate(cls.FIELDS) if mask >> i & 1))
+        out.append(struct.pack("<B", len(changed)))
+        out.extend(changed)
+        return b"".join(out)
+
+    @classmethod
+    def decode(cls, data, baselines):
+        # baselines: tick -> snap; None when the baseline is gone and the packet must be dropped
+        _, tick, base_tick, flags, rnd, secs = struct.unpack_from(cls.HEAD, data)
+        off = struct.calcsize(cls.HEAD)
+        if base_tick == cls.NO_BASE:
+            base = {"fish": (0, 0, 0, 0), "players": {}}
+        elif base_tick in baselines:
+            base = baselines[base_tick]
+        else:
+            return None, None
+        fish = base["fish"]
+        if flags & 1:
+            fish = struct.unpack_from("<HHHB", data, off); off += struct.calcsize("<HHHB")
+        players = dict(base["players"])
+        (count,) = struct.unpack_from("<B", data, off); off += 1
+        for _ in range(count):
+            pid, mask = struct.unpack_from("<BB", data, off); off += 2
+            p = list(players.get(pid, (0,) * len(cls.FIELDS)))
+            for i, (_, f) in enumerate(cls.FIELDS):
+                if mask >> i & 1:
+                    (p[i],) = struct.unpack_from("<" + f, data, off); off += struct.calcsize("<" + f)
+            if p[5] >> 2 >= len(cls.NET_STATES):
+                raise struct.error("bad net state")
+            players[pid] = tuple(p)
+        return tick, {"fish": fish, "players": players, "meta": (rnd, bool(flags & 2), secs)}
+
+
+KEY_BITS = ((pygame.K_UP, 1), (pygame.K_LEFT, 2), (pygame.K_RIGHT, 4), (pygame.K_DOWN, 8), (pygame.K_SPACE, 16))
+
+
+class NetHost:
+    # authoritative: simulates every waka, decides catches, sends snapshots at a fixed tick
+    def __init__(self, transport, tick_hz=NET_TICK_HZ, max_players=4, history=64):
+        self.transport = transport
+        self.tick_ms = 1000 / tick_hz
+        self.max_players = max_players
+        self.history = collections.OrderedDict()  # tick -> snap
+        self.history_len = history
+        self.tick = 0
+        self.next_tick_at = None
+        self.clients = {}  # addr -> {"pid", "ack", "keys", "seq"}
+        self.wakas = {}    # pid -> Waka for remote players
+        self.scores = collections.defaultdict(int)
+        self._fish, self._fish_id = None, 0
+        self.round, self.over, self.secs = 0, False, 0  # guests follow the host's rounds
+        self.bytes_out = collections.defaultdict(int)
+        self.tick_cost = []  # seconds spent per broadcast
+
+    def _poll(self, make_waka):
+        for data, addr in self.transport.recv():
+            kind = data[:1]
+            c = self.clients.get(addr)
+            if kind == b"J":
+                if c is None:
+                    if len(self.clients) + 1 >= self.max_players:
+                        continue
+                    pid = len(self.clients) + 1
+                    c = self.clients[addr] = {"pid": pid, "ack": None, "keys": 0, "seq": -1}
+                    self.wakas[pid] = make_waka()
+                self.transport.send(struct.pack("<cB", b"W", c["pid"]), addr)
+            elif kind == b"I" and c is not None:
+                if len(data) != struct.calcsize("<cIIB"):
+                    continue  # anyone can reach the port, drop malformed input
+                seq, ack, keys = struct.unpack_from("<IIB", data, 1)
+                if seq <= c["seq"]:
+                    continue  # late or duplicate
+                c["seq"] = seq
+                if ack in self.history and (c["ack"] is None or ack > c["ack"]):
+                    c["ack"] = ack
+                self._apply_keys(self.wakas[c["pid"]], c["keys"], keys)
+                c["keys"] = keys
+
+    @staticmethod
+    def _apply_keys(waka, old, new):
+        # key edges become the same events main() feeds the local waka
+        for key, bit in ((pygame.K_UP, 1), (pygame.K_SPACE, 16)):
+            if (old ^ new) & bit:
+                etype = pygame.KEYDOWN if new & bit else pygame.KEYUP
+                handle_play_event(pygame.event.Event(etype, key=key), waka, None)
+
+    def step(self, now_ms, local, fish, score, make_waka, remaining=0):
+        # returns the fish, or None when a remote player caught it
+        self.secs = remaining
+        self._poll(make_waka)
+        for c in self.clients.values():
+            waka = self.wakas[c["pid"]]
+            waka.handle_input({k: bool(c["keys"] & b) for k, b in KEY_BITS})
+            waka.update()
+        for pid, waka in self.wakas.items():
+            cam = Camera()  # centred on this waka, so catches work across the wrap
+            cam.follow(waka.x, waka.y)
+            if fish and waka.try_catch(fish, cam):
+                self.scores[pid] += 1
+                fish.remove()
+                fish = None
+        if self.next_tick_at is None or now_ms - self.next_tick_at > self.tick_ms:
+            self.next_tick_at = now_ms  # after a stall send one snapshot, not every missed tick
+        while now_ms >= self.next_tick_at:
+            self.broadcast(local, fish, score)
+            self.next_tick_at += self.tick_ms
+        return fish
+
+    def broadcast(self, local, fish, score):
+        t0 = time.perf_counter()
+        if fish is not self._fish:
+            self._fish = fish
+            self._fish_id = self._fish_id % 65535 + 1 if fish else self._fish_id
+        players = {0: SnapshotCodec.quantise(local, score)}
+        for pid, waka in self.wakas.items():
+            players[pid] = SnapshotCodec.quantise(waka, self.scores[pid])
+        snap = {"fish": SnapshotCodec.quantise_fish(self._fish_id, fish), "players": players,
+                "meta": (self.round, self.over, self.secs)}
+        self.tick += 1
+        self.history[self.tick] = snap
+        while len(self.history) > self.history_len:
+            self.history.popitem(last=False)
+        for addr, c in self.clients.items():
+            base_tick = c["ack"] if c["ack"] in self.history else None
+            data = SnapshotCodec.encode(self.tick, snap, self.history.get(base_tick), base_tick)
+            self.transport.send(data, addr)
+            self.bytes_out[addr] += len(data)
+        self.tick_cost.append(time.perf_counter() - t0)
+
+    def scoreboard(self, score):
+        return "  ".join(f"P{pid+1} {s}" for pid, s in
+                         sorted({0: score, **{p: self.scores[p] for p in self.wakas}}.items()))
+
+    def best(self):
+        return max((self.scores[p] for p in self.wakas), default=0)
+
+    def finish(self, local, fish, score, repeats=3):
+        # round over, sent a few times since the end screen stops step() and snapshots can drop
+        self.over, self.secs = True, 0
+        for _ in range(repeats):
+            self.broadcast(local, fish, score)
+
+    def reset(self, make_waka):
+        self.scores.clear()
+        self.round, self.over = (self.round + 1) % 256, False
+        self.next_tick_at = None
+        for pid in self.wakas:
+            self.wakas[pid] = make_waka()
+
+    def draw(self, gfx, cam=None):
+        for waka in self.wakas.values():
+            waka.draw(gfx, cam)
+
+
+class NetClient:
+    # sends key bits, keeps acked snapshots and draws everyone interpolated a little in the past
+    def __init__(self, transport, host_addr, tick_hz=NET_TICK_HZ, interp_ticks=2, keep=64):
+        self.transport, self.host_addr = transport, host_addr
+        self.tick_hz, self.interp_ticks, self.keep = tick_hz, interp_ticks, keep
+        self.pid = None
+        self.snaps = collections.OrderedDict()  # tick -> snap
+        self.latest = None
+        self.clock = None  # estimated host tick, float
+        self.seq = 0
+        self.last_join = -10**9
+        self.bytes_in = 0
+        self.others = {}
+        self.scores = {}
+        self._fish, self._fish_id = None, 0
+        self.round, self.over, self.secs = None, False, 0
+        self._score, self.ended = 0, None
+
+    @staticmethod
+    def key_bits(keys):
+        bits = 0
+        for key, bit in KEY_BITS:
+            if keys[key]:
+                bits |= bit
+        return bits
+
+    def send_input(self, now_ms, bits):
+        if self.pid is None:
+            if now_ms - self.last_join >= 500:
+                self.transport.send(b"J", self.host_addr)
+                self.last_join = now_ms
+            return
+        self.seq += 1
+        ack = self.latest if self.latest is not None else SnapshotCodec.NO_BASE
+        self.transport.send(struct.pack("<cIIB", b"I", self.seq, ack, bits), self.host_addr)
+
+    def receive(self, dt_ms):
+        for data, _ in self.transport.recv():
+            self.bytes_in += len(data)
+            kind = data[:1]
+            if kind == b"W" and len(data) == 2:
+                self.pid = data[1]
+            elif kind == b"S":
+                try:
+                    tick, snap = SnapshotCodec.decode(data, self.snaps)
+                except struct.error:
+                    continue  # truncated or garbage
+                if snap is None or (self.latest is not None and tick <= self.latest):
+                    continue
+                self.snaps[tick] = snap
+                self.latest = tick
+                while len(self.snaps) > self.keep:
+                    self.snaps.popitem(last=False)
+        if self.latest is None:
+            return
+        # run our own copy of the host tick clock, pulled toward what arrives
+        self.clock = self.latest if self.clock is None else self.clock + dt_ms * self.tick_hz / 1000
+        if abs(self.clock - self.latest) > 4 * self.interp_ticks:
+            self.clock = self.latest
+        self.clock += (self.latest - self.clock) * 0.05
+
+    def view(self):
+        # {pid: state dict}, fish tuple and round meta, interpolated at clock - interp_ticks
+        if self.latest is None:
+            return {}, None, None
+        t = self.clock - self.interp_ticks
+        ticks = [k for k in self.snaps if k <= t]
+        a = ticks[-1] if ticks else next(iter(self.snaps))
+        later = [k for k in self.snaps if k > a]
+        b = later[0] if later else a
+        f = 0.0 if b == a else max(0.0, min(1.0, (t - a) / (b - a)))
+        sa, sb = self.snaps[a], self.snaps[b]
+        out = {}
+        for pid, qb in sb["players"].items():
+            pb = SnapshotCodec.dequantise(qb)
+            qa = sa["players"].get(pid)
+            if qa is not None and f < 1.0:
+                pa = SnapshotCodec.dequantise(qa)
+                for k in ("x", "y"):
+                    span = WORLD_W if k == "x" else WORLD_H
+                    d = (pb[k] - pa[k] + span / 2) % span - span / 2  # don't lerp across the wrap
+                    pb[k] = (pa[k] + d * f) % span
+                pb["ang"] = pa["ang"] + ((pb["ang"] - pa["ang"] + 180) % 360 - 180) * f
+                if f < 0.5:
+                    for k in ("net_state", "net_idx", "frame"):
+                        pb[k] = pa[k]
+            out[pid] = pb
+        fish = sb["fish"] if sb["fish"][0] else None
+        return out, fish, sb["meta"]
+
+    @staticmethod
+    def _pose(waka, p):
+        waka.x, waka.y, waka.vx, waka.vy, waka.ang = p["x"], p["y"], p["vx"], p["vy"], p["ang"]
+        waka.net_state, waka.net_idx = p["net_state"], p["net_idx"]
+        waka.frame_idx = min(p["frame"], len(waka.frames) - 1)
+        waka.rowing = waka.frame_idx > 0
+
+    def sync(self, dt_ms, waka, fish_frames, make_waka):
+        # pose our waka and the others from the view, returns (fish, our score, caught)
+        self.receive(dt_ms)
+        players, fq, meta = self.view()
+        if meta is None:
+            return None, 0, False
+        new_round = meta[0] != self.round
+        self.round, self.over, self.secs = meta
+        score = 0
+        for pid, p in players.items():
+            if pid == self.pid:
+                self._pose(waka, p)
+                score = p["score"]
+                continue
+            if pid not in self.others:
+                self.others[pid] = make_waka()
+            self._pose(self.others[pid], p)
+        if not fq:
+            self._fish = None
+        else:
+            fid, fx, fy, frame = fq
+            if fid != self._fish_id or self._fish is None:
+                self._fish = Fish(fx / SnapshotCodec.POS_Q, fy / SnapshotCodec.POS_Q, base_frames=fish_frames)
+                self._fish_id = fid
+            self._fish.frame_idx = min(frame, self._fish.n_frames - 1)
+        self.scores = {pid: p["score"] for pid, p in players.items()}
+        # the host's score is the score, effects only when it goes up within a round
+        caught = not new_round and score > self._score
+        self._score = score
+        return self._fish, score, caught
+
+    def round_over(self):
+        # true once per round when the host ends it
+        if self.over and self.ended != self.round:
+            self.ended = self.round
+            return True
+        return False
+
+    def scoreboard(self, score):
+        return "  ".join(f"P{pid+1} {s}" for pid, s in sorted(self.scores.items()))
+
+    def best(self):
+        return max((s for pid, s in self.scores.items() if pid != self.pid), default=0)
+
+    def draw(self, gfx, cam=None):
+        for waka in self.others.values():
+            waka.draw(gfx, cam)
+
 
 class UiKit:
-    def __init__(self, screen, border_surface,
+    def __init__(self, gfx, border_surface,
                  button_fill=MAORI_RED, text_color=BRT_WHITE,
                  outline_idle=DARK_GRAY, corner_radius=14,
                  bg_color=OFF_WHITE, font_name="fonts/DejaVuSans.ttf", font_sizes=None,
                  ui_scale=0.70):
-        self.screen = screen
+        self.gfx = gfx
+        self.screen = screen = gfx.screen  # menus draw here, the game goes through gfx
         self.border_src = border_surface.convert_alpha()
+        self._star_cache = {}
         self.button_fill = button_fill
         self.text_color = text_color
         self.outline_idle = outline_idle
@@ -374,7 +1792,8 @@ class UiKit:
             return (pygame.font.Font(font_name, size)
                     if font_name else pygame.font.SysFont(None, size))
 
-        self.fonts = {k: make(v) for k, v in base.items()}
+        with STARTUP.span("ui.fonts"):
+            self.fonts = {k: make(v) for k, v in base.items()}
 
     def font(self, key):
         return self.fonts[key]
@@ -385,13 +1804,13 @@ class UiKit:
         self.screen.blit(surf, rect)
         return rect
 
+    def _scaled_border(self, scale):
+        bw, bh = self.border_src.get_size()
+        return pygame.transform.smoothscale(self.border_src, (int(bw*scale), int(bh*scale)))
+
     def _draw_border(self, scale=0.95):
         if scale not in self._border_cache:
-            bw, bh = self.border_src.get_size()
-            surf = pygame.transform.smoothscale(
-                self.border_src, (int(bw*scale), int(bh*scale))
-            )
-            self._border_cache[scale] = surf
+            self._border_cache[scale] = self._scaled_border(scale)
         img = self._border_cache[scale]
         rect = img.get_rect(center=(self.screen.get_width()//2,
                                     self.screen.get_height()//2))
@@ -436,32 +1855,48 @@ class UiKit:
         return stops[-1][1]
 
     def fill_sky(self, start_time, cycle_length=60, stops=None):
-        self.screen.fill(self.sky_color(start_time, cycle_length, stops))
+        self.gfx.fill(self.sky_color(start_time, cycle_length, stops))
+
+    def _dim(self, overlay_alpha):
+        # same as blitting black at overlay_alpha, without a fresh SRCALPHA surface
+        k = 255 - overlay_alpha
+        self.screen.fill((k, k, k), special_flags=pygame.BLEND_RGB_MULT)
+
+    def _strip_star(self, im, max_h, alpha):
+        s = max_h / float(im.get_height())
+        out = pygame.transform.smoothscale(im, (int(im.get_width()*s), int(im.get_height()*s)))
+        return fade(out, alpha, self.gfx.premultiplied)
+
+    def prebake(self, baker, stars, border_scales=(0.99,), strip_h=(END_STARS_H,), alpha=220, stage="derived"):
+        # menu borders and end-screen star strips, installed into the caches in wait()
+        for scale in border_scales:
+            baker.submit(("border", scale), self._scaled_border, scale, stage=stage,
+                         done=lambda img, scale=scale: self._border_cache.__setitem__(scale, img))
+        for max_h in strip_h:
+            for im in stars:
+                key = (id(im), max_h, alpha)
+                baker.submit(("strip", key), self._strip_star, im, max_h, alpha, stage=stage,
+                             done=lambda img, key=key: self._star_cache.__setitem__(key, img))
 
     def _blit_matariki_stars(self, star_imgs, y, max_h=56, gap=12, alpha=220):
         scaled = []
         for im in star_imgs:
-            h = im.get_height()
-            s = max_h / float(h)
-            out = pygame.transform.smoothscale(
-                im, (int(im.get_width()*s), int(h*s))
-            ).convert_alpha()
-            out.set_alpha(alpha)
-            scaled.append(out)
+            key = (id(im), max_h, alpha)
+            if key not in self._star_cache:
+                self._star_cache[key] = self._strip_star(im, max_h, alpha)
+            scaled.append(self._star_cache[key])
         total_w = sum(i.get_width() for i in scaled) + gap*(len(scaled)-1)
         x = (self.screen.get_width() - total_w)//2
         for im in scaled:
-            self.screen.blit(im, (x, y - im.get_height()//2))
+            self.screen.blit(im, (x, y - im.get_height()//2), special_flags=self.gfx.blend)
             x += im.get_width() + gap
 
     def draw_end(self, msg, stars=None, border_scale=0.99, overlay_alpha=140,
                  stars_h=56, stars_gap=12):
         self.screen.fill(self.bg_color)
         bimg, brect = self._draw_border(border_scale)
-        self.screen.blit(bimg, brect)
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((0,0,0,overlay_alpha))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(bimg, brect, special_flags=self.gfx.blend)
+        self._dim(overlay_alpha)
         cx, cy = self.screen.get_width()//2, self.screen.get_height()//2
         self.render_center("title", self.title, EGG_SHELL, (cx, cy-100))
         self.render_center("subtitle", msg, BRT_WHITE, (cx, cy-40))
@@ -477,10 +1912,11 @@ class UiKit:
 
         while True:
             clock.tick(fps)
+            frame_start = time.perf_counter()
             mouse = pygame.mouse.get_pos()
             clicked = False
             for e in pygame.event.get():
-                if e.type == pygame.QUIT:
+                if e.type in QUIT_EVENTS:
                     hard_quit()
                 if e.type == pygame.KEYDOWN:
                     if e.key == pygame.K_RETURN:
@@ -492,10 +1928,8 @@ class UiKit:
 
             self.screen.fill(self.bg_color)
             bimg, brect = self._draw_border(border_scale)
-            self.screen.blit(bimg, brect)
-            overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-            overlay.fill((0,0,0,overlay_alpha))
-            self.screen.blit(overlay, (0,0))
+            self.screen.blit(bimg, brect, special_flags=self.gfx.blend)
+            self._dim(overlay_alpha)
 
             cx, cy = self.screen.get_width()//2, self.screen.get_height()//2
             self.render_center("title", title or self.title, EGG_SHELL, (cx, cy + title_y))
@@ -520,7 +1954,8 @@ class UiKit:
                 if over and clicked:
                     return val
 
-            pygame.display.flip()
+            self.gfx.present_screen()
+            STARTUP.first_frame(frame_start)
             await asyncio.sleep(0)
 
     async def show_menu(self):
@@ -532,7 +1967,7 @@ class UiKit:
     async def show_end_result(self, collected_stars, total=9,
                             subtitle_win="Ka pai e hoa, 9 whetū complete!",
                             subtitle_lose="Aroha mai. Try again!",
-                            star_h = 140, btn_y = 140):
+                            star_h = END_STARS_H, btn_y = 140):
         n = len(collected_stars) if collected_stars else 0
         win = (n >= total)
         msg = subtitle_win if win else f"{subtitle_lose} {n}/9 whetū. You caught {n}/{total}."
@@ -567,7 +2002,7 @@ class UiKit:
             clock.tick(fps)
             mouse = pygame.mouse.get_pos(); clicked = False
             for e in pygame.event.get():
-                if e.type == pygame.QUIT: hard_quit() 
+                if e.type in QUIT_EVENTS: hard_quit() 
                 if e.type == pygame.KEYDOWN:
                     if e.key in (pygame.K_RETURN, pygame.K_SPACE): return "next"
                     if e.key == pygame.K_ESCAPE: return "back"
@@ -576,9 +2011,8 @@ class UiKit:
 
             self.screen.fill(self.bg_color)
             bimg, brect = self._draw_border(border_scale)
-            self.screen.blit(bimg, brect)
-            overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-            overlay.fill((0,0,0,overlay_alpha)); self.screen.blit(overlay, (0,0))
+            self.screen.blit(bimg, brect, special_flags=self.gfx.blend)
+            self._dim(overlay_alpha)
 
             pad = 28
             content = brect.inflate(-pad*2, -pad*2)
@@ -604,7 +2038,7 @@ class UiKit:
             self._draw_button((cx, by), btn_surf, btn_rect, btn_box, over)
             if over and clicked: return "next"
 
-            pygame.display.flip()
+            self.gfx.present_screen()
             await asyncio.sleep(0)
 
     async def show_howto(self):
@@ -647,19 +2081,24 @@ class UiKit:
 
 class SoundKit:
     def __init__(self, base="sounds", volumes=None, num_channels=16):
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-        pygame.mixer.set_num_channels(num_channels)
+        with STARTUP.span("sounds.mixer_init"):
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.set_num_channels(num_channels)
         self.type = "ogg"
         self.base = base
-        self.coin = self._load("get-coin."+self.type)
-        self.row_splashes = self._load_seq("row_splash__{}."+self.type, 1, 7)
-        self.fish_splashes = self._load_seq("fish_splash__{}."+self.type, 1, 6)
-        self.net_flips = self._load_seq("net_flip__{}."+self.type, 1, 4)
-        self.count = {i:self._load(n) for i,n in enumerate(
-            ["tahi_ika."+self.type,"rua_ika."+self.type,"toru_ika."+self.type,"wha_ika."+self.type,
-             "rima_ika."+self.type,"ono_ika."+self.type,"whitu_ika."+self.type,"waru_ika."+self.type,
-             "iwa_ika."+self.type], start=1)}
+        with STARTUP.span("sounds.coin"):
+            self.coin = self._load("get-coin."+self.type)
+        with STARTUP.span("sounds.splashes"):
+            self.row_splashes = self._load_seq("row_splash__{}."+self.type, 1, 7)
+            self.fish_splashes = self._load_seq("fish_splash__{}."+self.type, 1, 6)
+        with STARTUP.span("sounds.nets"):
+            self.net_flips = self._load_seq("net_flip__{}."+self.type, 1, 4)
+        with STARTUP.span("sounds.count"):
+            self.count = {i:self._load(n) for i,n in enumerate(
+                ["tahi_ika."+self.type,"rua_ika."+self.type,"toru_ika."+self.type,"wha_ika."+self.type,
+                 "rima_ika."+self.type,"ono_ika."+self.type,"whitu_ika."+self.type,"waru_ika."+self.type,
+                 "iwa_ika."+self.type], start=1)}
 
         self.vols = {"coin":0.2,"row":0.1,"fish":0.5,"net":0.8,"count":0.9}
         if volumes: self.vols.update(volumes)
@@ -731,17 +2170,57 @@ def set_params(diff):
     else:
         TIME_LIMIT, FISH_LIFE = 30, 3.0
 
+def handle_play_event(e, waka, snd):
+    # returns the tick the rowing wake is due if this event started a stroke
+    if e.type == pygame.KEYDOWN and e.key == pygame.K_UP:
+        if not waka.stroking and not waka.net_active():
+            waka.stroking = True
+            waka._play_splash()
+            waka.stroke_start = pygame.time.get_ticks()
+            return pygame.time.get_ticks() + ROW_WAKE_DELAY_MS
+    elif e.type == pygame.KEYUP and e.key == pygame.K_UP:
+        waka.stroking = False
+
+    elif e.type == pygame.KEYDOWN and e.key == pygame.K_SPACE:
+        s = snd.random_net() if snd else None
+        if s: s.play()
+        if waka.net_state in ("idle", "retracting"):
+            waka.net_state = "extending"
+    elif e.type == pygame.KEYUP and e.key == pygame.K_SPACE:
+        s = snd.random_net() if snd else None
+        if s: s.play()
+        if waka.net_state in ("extending", "held"):
+            waka.net_state = "retracting"
+    return None
+
 def hard_quit():
     pygame.quit()
     if sys.platform != "emscripten":
         sys.exit(0)
 
 async def main():
-    pygame.mixer.init()
-    screen = pygame.display.set_mode((W, H))
-    snd = SoundKit()
-    ik = ImagesKit()
-    ui = UiKit(screen, ik.border)
+    with STARTUP.span("main.setup"):
+        with STARTUP.span("mixer.init"):
+            pygame.mixer.init()
+        with STARTUP.span("renderer"):
+            gfx = make_renderer((W, H))
+        with STARTUP.span("SoundKit"):
+            snd = SoundKit()
+        baker = AssetBaker()
+        with STARTUP.span("ImagesKit"):
+            ik = ImagesKit(baker=baker)
+        with STARTUP.span("UiKit"):
+            ui = UiKit(gfx, ik.border)
+        with STARTUP.span("bake"):
+            CatchEffect.prebake(baker, ik.stars)
+            ui.prebake(baker, ik.stars)
+            ocean = make_ocean(baker) if OCEAN else None  # derived jobs keep running meanwhile
+            baker.wait("derived")
+            baker.close()
+
+    tel = Telemetry.for_platform()
+    if tel:
+        tel_task = asyncio.create_task(tel.run())  # keep a ref so it isn't collected
 
     # main menu
     # main menu loop
@@ -759,6 +2238,7 @@ async def main():
             diff = await ui.show_difficulty()
             if diff in ("easy","medium","hard"):
                 set_params(diff)
+                if tel: tel.emit("difficulty", diff=diff)
                 break      # proceed to game state
             else:
                 continue   # back to menu
@@ -774,23 +2254,56 @@ async def main():
     clock = pygame.time.Clock()
     font = ui.fonts["hud"]
 
+    timers = TimerWheel(pygame.time.get_ticks(), seed=SEED)
     waka = Waka(
         W/2, H/2,
         splash_snds=snd.row_splashes,
         frames=ik.waka_frames,
-        net_frames=ik.net_frames
+        net_frames=ik.net_frames,
+        timers=timers
     )
 
     wake_small = WakeTrail(ik.wake_small, start_scale=0.7, end_scale=1.2)
     wake_big   = WakeTrail(ik.wake_big,   start_scale=0.8, end_scale=1.25)
     row_wake   = WakeTrail(ik.rowing_wake, start_scale=0.9, end_scale=1.3, back_offset=0, life_ms=1000)
+    cam = Camera()
+    fleet = RivalFleet(RIVALS, ik.waka_frames, ik.net_frames, seed=SEED) if RIVALS and not NET_JOIN else None
+    make_waka = lambda: Waka(W/2, H/2, frames=ik.waka_frames, net_frames=ik.net_frames)
+    net = client = None  # host or guest side of a networked game, rivals stay local to the host
+    if sys.platform != "emscripten" and NET_HOST:
+        net = NetHost(UdpTransport(("0.0.0.0", int(NET_HOST))))
+    elif sys.platform != "emscripten" and NET_JOIN:
+        addr, port = NET_JOIN.rsplit(":", 1)
+        client = NetClient(UdpTransport(), (addr, int(port)))
+
+    def spawn_wakes():
+        wake_small.emit(waka.x, waka.y, waka.ang)
+        if waka.rowing and not waka.net_active():
+            wake_big.emit(waka.x, waka.y, waka.ang)
+
+    def spawn_fish():
+        nonlocal fish, spawn_timer
+        spawn_timer = None
+        if fish is not None:
+            return
+        # spawn margins are relative to the view, origin is (0,0) on a single screen
+        ox, oy = cam.origin()
+        sx = W//2 if cheat_center else timers.rng.randint(FISH_UPPERBOUND, W - FISH_UPPERBOUND)
+        sy = H//2 if cheat_center else timers.rng.randint(FISH_LOWERBOUND, H - FISH_UPPERBOUND)
+        fish = Fish((ox + sx) % WORLD_W, (oy + sy) % WORLD_H,
+                    base_frames=ik.fish_frames, splash_snds=snd.fish_splashes, timers=timers)
 
     fish = None
+    spawn_timer = None
+    timers.every(wake_small.spawn_ms, spawn_wakes)
     score = 0
     start = time.time()
     catch_effect = None
-    row_wake_due = None
     cheat_center = False
+    strokes, net_open_at = 0, None
+    if tel: tel.emit("game_start", time_limit=TIME_LIMIT, fish_life=FISH_LIFE)
+
+    probe = InputLatencyProbe() if os.environ.get("WAKA_LATENCY") else None
 
     freeze_frame = None
     running = True
@@ -799,7 +2312,7 @@ async def main():
 
         # events
         for e in pygame.event.get():
-            if e.type == pygame.QUIT:
+            if e.type in QUIT_EVENTS:
                 hard_quit()
 
             # cheat toggle always allowed
@@ -811,59 +2324,69 @@ async def main():
             if state != "play":
                 continue  # inputs frozen when ending
 
-            if e.type == pygame.KEYDOWN and e.key == pygame.K_UP:
-                if not waka.stroking and not waka.net_active():
-                    waka.stroking = True
-                    waka._play_splash()
-                    waka.stroke_start = pygame.time.get_ticks()
-                    row_wake_due = pygame.time.get_ticks() + ROW_WAKE_DELAY_MS
-            elif e.type == pygame.KEYUP and e.key == pygame.K_UP:
-                waka.stroking = False
-
-            elif e.type == pygame.KEYDOWN and e.key == pygame.K_SPACE:
-                s = snd.random_net()
-                if s: s.play()
-                if waka.net_state in ("idle", "retracting"):
-                    waka.net_state = "extending"
-            elif e.type == pygame.KEYUP and e.key == pygame.K_SPACE:
-                s = snd.random_net()
-                if s: s.play()
-                if waka.net_state in ("extending", "held"):
-                    waka.net_state = "retracting"
+            if probe: probe.poll(e, waka)
+            due = handle_play_event(e, waka, snd)
+            if due:
+                # single rowing wake once per initial press
+                timers.at(due, lambda: row_wake.spawn(waka.x, waka.y, waka.ang))
+                strokes += 1
+            if tel and e.type in (pygame.KEYDOWN, pygame.KEYUP) and e.key == pygame.K_SPACE:
+                if e.type == pygame.KEYDOWN:
+                    net_open_at = pygame.time.get_ticks()
+                elif net_open_at is not None:
+                    tel.emit("net", open_ms=pygame.time.get_ticks() - net_open_at)
+                    net_open_at = None
 
         # ending state: delay, then dialog
         if state == "ending":
             collected_stars = ik.stars[:score]
-            choice = await ui.show_end_result(collected_stars, total=9)
+            beaten = score < TARGET and ((fleet and fleet.best() >= TARGET) or (net and net.best() >= TARGET))
+            lose = f"Aroha mai, another waka caught {TARGET} first!" if beaten else "Aroha mai. Try again!"
+            choice = await ui.show_end_result(collected_stars, total=9, subtitle_lose=lose)
             if choice == "replay":
                 # reset
-                score = 0; fish = None; catch_effect = None; row_wake_due = None
+                if fish: fish.remove()
+                score = 0; fish = None; catch_effect = None; spawn_timer = None
+                strokes, net_open_at = 0, None
                 start = time.time()
+                if tel: tel.emit("game_start", time_limit=TIME_LIMIT, fish_life=FISH_LIFE)
+                timers = TimerWheel(pygame.time.get_ticks(), seed=SEED)
                 waka = Waka(W/2, H/2, splash_snds=snd.row_splashes,
-                            frames=ik.waka_frames, net_frames=ik.net_frames)
+                            frames=ik.waka_frames, net_frames=ik.net_frames, timers=timers)
                 wake_small = WakeTrail(ik.wake_small, start_scale=0.7, end_scale=1.2)
                 wake_big   = WakeTrail(ik.wake_big,   start_scale=0.8, end_scale=1.25)
                 row_wake   = WakeTrail(ik.rowing_wake, start_scale=0.9, end_scale=1.3, back_offset=0, life_ms=1000)
+                timers.every(wake_small.spawn_ms, spawn_wakes)
+                cam = Camera()
+                if fleet: fleet.reset(pygame.time.get_ticks())
+                if net: net.reset(make_waka)
                 state = "play"
                 continue
             else:
                 running = False
                 continue
 
+        if tel: tel.frame(dt)
+
         # gameplay update
         keys = pygame.key.get_pressed()
-        waka.handle_input(keys)
-        waka.update()
-
-        # schedule single rowing wake once per initial press
-        if row_wake_due and pygame.time.get_ticks() >= row_wake_due:
-            row_wake.spawn(waka.x, waka.y, waka.ang)
-            row_wake_due = None
+        if client:
+            # the host simulates us, we only send keys and show what comes back
+            client.send_input(pygame.time.get_ticks(), NetClient.key_bits(keys))
+            fish, score, caught = client.sync(dt, waka, ik.fish_frames, make_waka)
+            if caught:
+                snd.play_coin()
+                snd.say_count(score)
+                catch_effect = CatchEffect(waka.x, waka.y, ik.star_for_score(score))
+        else:
+            waka.handle_input(keys)
+            waka.update()
+        cam.follow(waka.x, waka.y)
+        if fleet: fleet.update(pygame.time.get_ticks(), fish)
 
-        # spawn wakes
-        wake_small.spawn(waka.x, waka.y, waka.ang)
-        if waka.rowing and not waka.net_active():
-            wake_big.spawn(waka.x, waka.y, waka.ang)
+        # nets, wakes, splashes and fish spawns that came due
+        timers.advance(pygame.time.get_ticks())
+        if probe: probe.mark_sim(waka)
 
         wake_small.update(dt)
         wake_big.update(dt)
@@ -871,56 +2394,90 @@ async def main():
 
         # fish spawn
         now = time.time()
-        if fish is None and random.random() < 0.02:
-            sx = W//2 if cheat_center else random.randint(FISH_UPPERBOUND, W - FISH_UPPERBOUND)
-            sy = H//2 if cheat_center else random.randint(FISH_LOWERBOUND, H - FISH_UPPERBOUND)
-            fish = Fish(sx, sy, base_frames=ik.fish_frames, splash_snds=snd.fish_splashes)
+        if client:
+            pass  # the host owns the fish
+        elif fish is None and spawn_timer is None:
+            spawn_timer = timers.after(timers.rng.expovariate(FISH_SPAWN_PER_S) * 1000, spawn_fish)
         elif fish and not fish.alive:
+            fish.remove()
             fish = None
 
-        if fish:
+        if fish and not client:
             if cheat_center:
-                fish.x, fish.y = W//2, H//2
+                ox, oy = cam.origin()
+                fish.x, fish.y = (ox + W//2) % WORLD_W, (oy + H//2) % WORLD_H
             fish.update()
 
-        # catch check
-        if fish and waka.try_catch(fish):
+        # catch check, fish left off-screen can't be netted
+        if fish and not client and cam.visible(fish.x, fish.y, 0) and waka.try_catch(fish, cam):
             score += 1
+            if tel: tel.emit("catch", score=score, at_s=time.time() - start)
             snd.play_coin()
             snd.say_count(score)
             star_img = ik.star_for_score(score)
             catch_effect = CatchEffect(fish.x, fish.y, star_img)
+            fish.remove()
             fish = None
+        elif fish and fleet:
+            i = fleet.try_catch(fish)
+            if i >= 0:
+                fleet.score[i] += 1
+                if tel: tel.emit("rival_catch", rival=i, at_s=time.time() - start)
+                fish.remove()
+                fish = None
+        if net:
+            fish = net.step(pygame.time.get_ticks(), waka, fish, score, make_waka,
+                            remaining=max(0, int(TIME_LIMIT - (now - start))))
 
         # draw
-        ui.fill_sky(start, cycle_length=TIME_LIMIT)
+        if ocean:
+            ocean.draw(gfx, ui.sky_color(start, cycle_length=TIME_LIMIT), cam.scroll())
+        else:
+            ui.fill_sky(start, cycle_length=TIME_LIMIT)
         if catch_effect:
             catch_effect.update(dt)
-            catch_effect.draw(screen)
+            catch_effect.draw(gfx, cam)
             if catch_effect.done:
                 catch_effect = None
 
         if fish:
-            fish.draw(screen)
+            fish.draw(gfx, cam)
 
-        row_wake.draw(screen)
-        wake_small.draw(screen)
-        wake_big.draw(screen)
-        waka.draw(screen)
+        row_wake.draw(gfx, cam)
+        wake_small.draw(gfx, cam)
+        wake_big.draw(gfx, cam)
+        if fleet: fleet.draw(gfx, cam)
+        if net or client: (net or client).draw(gfx, cam)
+        waka.draw(gfx, cam)
 
-        remaining = max(0, int(TIME_LIMIT - (now - start)))
+        # guests keep the host's clock and wait for the host to end the round
+        remaining = client.secs if client else max(0, int(TIME_LIMIT - (now - start)))
         hud = f"Fish {score}/{TARGET}   Time {remaining}s"
-        screen.blit(font.render(hud, True, BRT_WHITE), (10, 10))
+        if fleet: hud += f"   Rivals {fleet.best()}"
+        if net or client: hud += "   " + (net or client).scoreboard(score)
+        if client and client.over: hud += "   waiting for host"
+        gfx.blit(font.render(hud, True, BRT_WHITE), (10, 10), transient=True)
 
         # end trigger
-        if score >= TARGET or remaining <= 0:
+        if client:
+            over = client.round_over()
+        else:
+            over = (score >= TARGET or remaining <= 0 or (net and net.best() >= TARGET)
+                    or (fleet and fleet.best() >= TARGET))
+        if over:
             waka.vx = waka.vy = 0.0
             waka.rowing = waka.stroking = False
             state = "ending"
+            if net: net.finish(waka, fish, score)
+            if probe: print(probe.format_report())
+            if tel: tel.emit("game_end", score=score, strokes=strokes,
+                             duration_s=now - start, win=score >= TARGET, timers=timers.stats())
 
-        pygame.display.flip()
+        gfx.present()
+        if probe: probe.mark_flip()
         await asyncio.sleep(0)
 
+    if tel: tel.close()
     hard_quit()
 
 